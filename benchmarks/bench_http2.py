@@ -0,0 +1,117 @@
+"""
+Compare the throughput, tail latency and amount of connections of HTTP/1.1 and HTTP/2 async sessions, against a local
+stand-in server (see `http2_server.py`).
+
+Usage: python bench_http2.py [--requests 500] [--concurrency 50] [--server-python /path/to/python]
+
+The server needs `hypercorn` and `trustme`; use `--server-python` to run it with an interpreter that has them.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from os.path import abspath, dirname, join
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from esi.core import ESIBase  # noqa: E402
+from esi.spec import Function  # noqa: E402
+
+
+class Orders(Function):
+    path = '/orders/'
+    name = 'get_orders'
+    method = 'get'
+
+
+class Stats(Function):
+    path = '/stats/'
+    name = 'get_stats'
+    method = 'get'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def run(esi_class, verify, requests, concurrency):
+    esi = esi_class()
+    # Disable the caching layers, we want to measure the transport
+    client = esi.get_async_session_class()(esi=esi, verify=verify, cache=None, coalesce=False)
+    latencies = []
+    queue = iter(range(requests))
+
+    async def worker():
+        for _ in queue:
+            start = time.perf_counter()
+            status, data, headers = await client.send_esi_request(Orders())
+            assert status == 200
+            latencies.append(time.perf_counter() - start)
+
+    async with client:
+        # Reset the connection count of the server
+        await client.send_esi_request(Stats())
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+        connections = (await client.send_esi_request(Stats()))[1]['connections']
+    return {
+        'throughput': requests / elapsed,
+        'p50': percentile(latencies, 50) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+        'connections': connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--server-python', default=sys.executable)
+    args = parser.parse_args()
+
+    port = free_port()
+
+    class LocalESI(ESIBase):
+        host = 'localhost:%d' % port
+        base_path = '/'
+
+    class LocalHTTP2ESI(LocalESI):
+        http2 = True
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = subprocess.Popen([args.server_python, join(dirname(abspath(__file__)), 'http2_server.py'),
+                                   str(port), directory], stdout=subprocess.PIPE)
+        try:
+            server.stdout.readline()
+            # Wait for the server to accept connections
+            for _ in range(100):
+                try:
+                    socket.create_connection(('localhost', port)).close()
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            verify = os.path.join(directory, 'ca.pem')
+            print('%-10s %12s %10s %10s %12s' % ('protocol', 'requests/s', 'p50 (ms)', 'p99 (ms)', 'connections'))
+            for name, klass in [('HTTP/1.1', LocalESI), ('HTTP/2', LocalHTTP2ESI)]:
+                result = asyncio.run(run(klass, verify, args.requests, args.concurrency))
+                print('%-10s %12.1f %10.1f %10.1f %12d' % (name, result['throughput'], result['p50'], result['p99'],
+                                                           result['connections']))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
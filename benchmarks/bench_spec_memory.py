@@ -0,0 +1,131 @@
+"""
+Measure the memory used by loading an ESI spec.
+
+Usage: python bench_spec_memory.py [--file swagger.json | --spec latest | --paths 200] [--meta]
+
+Without a file or spec name, a synthetic spec shaped like ESI's (flat and nested response objects, global parameters
+and definitions) is generated, so this can run offline.
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from esi.spec import Describeable, ESISpec  # noqa: E402
+
+
+def synthetic_spec(paths):
+    def order():
+        return {
+            'type': 'object',
+            'required': ['order_id', 'price', 'issued'],
+            'properties': {
+                'order_id': {'type': 'integer', 'format': 'int64', 'description': 'order_id integer'},
+                'price': {'type': 'number', 'format': 'double', 'description': 'price number'},
+                'issued': {'type': 'string', 'format': 'date-time', 'description': 'issued string'},
+                'range': {'type': 'string', 'enum': ['station', 'region', 'solarsystem'], 'description': 'range'},
+                'location': {
+                    'type': 'object',
+                    'properties': {
+                        'x': {'type': 'number', 'format': 'double'},
+                        'y': {'type': 'number', 'format': 'double'},
+                        'z': {'type': 'number', 'format': 'double'},
+                    },
+                },
+            },
+        }
+
+    spec = {
+        'swagger': '2.0',
+        'info': {'title': 'EVE Swagger Interface', 'version': '1.0.0', 'description': 'Synthetic'},
+        'host': 'esi.test',
+        'basePath': '/latest',
+        'schemes': ['https'],
+        'parameters': {
+            'datasource': {'name': 'datasource', 'in': 'query', 'type': 'string', 'default': 'tranquility',
+                           'enum': ['tranquility']},
+            'page': {'name': 'page', 'in': 'query', 'type': 'integer', 'format': 'int32', 'default': 1,
+                     'minimum': 1},
+        },
+        'definitions': {
+            'bad_request': {'type': 'object', 'title': 'Bad request',
+                            'properties': {'error': {'type': 'string'}}},
+        },
+        'paths': {},
+    }
+    for x in range(paths):
+        spec['paths']['/things/%d/orders/' % x] = {
+            'get': {
+                'operationId': 'get_things_%d_orders' % x,
+                'tags': ['Things'],
+                'description': 'Return the orders of thing %d' % x,
+                'parameters': [
+                    {'$ref': '#/parameters/datasource'},
+                    {'$ref': '#/parameters/page'},
+                    {'name': 'thing_id', 'in': 'path', 'required': True, 'type': 'integer', 'format': 'int32'},
+                ],
+                'responses': {
+                    '200': {'description': 'Orders', 'schema': {'type': 'array', 'items': order()}},
+                    '400': {'description': 'Bad request', 'schema': {'$ref': '#/definitions/bad_request'}},
+                },
+            },
+        }
+    return spec
+
+
+def measure(load):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    spec = load()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    describeables = sum(1 for x in gc.get_objects() if isinstance(x, Describeable))
+    return spec, {
+        'seconds': elapsed,
+        'retained_mb': current / 1024 / 1024,
+        'peak_mb': peak / 1024 / 1024,
+        'describeables': describeables,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--file', help="A swagger.json to load")
+    parser.add_argument('--spec', help="The name of an ESI spec to download, like latest")
+    parser.add_argument('--meta', action='store_true', help="Add the meta spec, like the generator does")
+    parser.add_argument('--paths', type=int, default=200, help="The amount of paths of the synthetic spec")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding='utf-8') as fh:
+            data = json.load(fh)
+    elif args.spec:
+        data = ESISpec.from_spec(args.spec)._data
+    else:
+        data = synthetic_spec(args.paths)
+    document = json.dumps(data)
+
+    def load():
+        spec = ESISpec.from_document(document)
+        if args.meta:
+            spec += ESISpec.meta_spec()
+        return spec
+
+    spec, result = measure(load)
+    print('paths:         %d' % len(spec.paths))
+    print('describeables: %d' % result['describeables'])
+    print('load time:     %.3f s' % result['seconds'])
+    print('retained:      %.2f MiB' % result['retained_mb'])
+    print('peak:          %.2f MiB' % result['peak_mb'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+A local stand-in for ESI, serving HTTP/1.1 and HTTP/2 over TLS, for benchmarking purposes.
+
+Requires `hypercorn` and `trustme`. As these may conflict with the HTTP libraries used by esi-py, this is meant to be
+started (by `bench_http2.py`) with a separate interpreter that has them installed.
+
+Usage: python http2_server.py <port> <directory to write the CA certificate to>
+"""
+import asyncio
+import json
+import os
+import sys
+
+import trustme
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+
+PAYLOAD = json.dumps([{
+    'order_id': x,
+    'type_id': 34,
+    'price': 5.5 + x,
+    'volume_remain': 100,
+    'is_buy_order': bool(x % 2),
+    'issued': '2020-01-01T12:00:00Z',
+} for x in range(50)]).encode()
+CONNECTIONS = set()
+
+
+async def app(scope, receive, send):
+    if scope['type'] != 'http':
+        return
+    CONNECTIONS.add(tuple(scope['client']))
+    if scope['path'] == '/stats/':
+        body = json.dumps({'connections': len(CONNECTIONS)}).encode()
+        CONNECTIONS.clear()
+    else:
+        # Simulate the latency of ESI generating the response
+        await asyncio.sleep(0.005)
+        body = PAYLOAD
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def main():
+    port, directory = int(sys.argv[1]), sys.argv[2]
+    ca = trustme.CA()
+    cert = ca.issue_cert('localhost')
+    ca.cert_pem.write_to_path(os.path.join(directory, 'ca.pem'))
+    cert.private_key_pem.write_to_path(os.path.join(directory, 'key.pem'))
+    cert.cert_chain_pems[0].write_to_path(os.path.join(directory, 'cert.pem'))
+
+    config = Config()
+    config.bind = ['localhost:%d' % port]
+    config.certfile = os.path.join(directory, 'cert.pem')
+    config.keyfile = os.path.join(directory, 'key.pem')
+    config.alpn_protocols = ['h2', 'http/1.1']
+    config.h2_max_concurrent_streams = 100
+    config.loglevel = 'WARNING'
+    print('ready', flush=True)
+    asyncio.run(serve(app, config))
+
+
+if __name__ == '__main__':
+    main()
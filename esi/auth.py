@@ -0,0 +1,105 @@
+import asyncio
+import time
+from threading import Lock
+
+from esi.utils import PerLoop
+
+
+class TokenProvider:
+    """
+    Provides the access token for a single character, evaluated per request.
+
+    The token is cached until shortly before it expires, after which it is refreshed through the `refresh` (or
+    `refresh_async`) callable. Refreshing happens under a lock, so only one refresh is ever in flight for the
+    character, no matter how many requests (from sync clients, async clients or multiple event loops) need the token
+    at the same time. A custom `refresh_async` coroutine can only be guarded per event loop, so it may run alongside
+    a refresh from a sync client or another event loop.
+
+    Pass an instance as the `auth_token` of an ESI instance. As it is callable, it can be used wherever a callable
+    returning the token is accepted.
+    """
+    def __init__(self, refresh=None, refresh_async=None, identity=None, margin=60, token=None, expires_at=None):
+        """
+        :param refresh: A callable returning a tuple of the new access token and the amount of seconds it is valid
+        :param refresh_async: A coroutine function returning the same, used from async clients. Defaults to running
+                              `refresh` in the default executor of the event loop.
+        :param identity: A stable identifier for the character (like its character ID)
+        :param margin: The amount of seconds before the token expires at which it is refreshed
+        :param token: The current access token, if any
+        :param expires_at: The timestamp the current access token expires at
+        """
+        self._refresh = refresh
+        self._refresh_async = refresh_async
+        self.identity = identity
+        self.margin = margin
+        self.token = token
+        self.expires_at = expires_at
+        self.refresh_count = 0
+        self._lock = Lock()
+        self._async_locks = PerLoop(asyncio.Lock)
+
+    def is_valid(self, now=None) -> bool:
+        if not self.token or self.expires_at is None:
+            return False
+        return (time.time() if now is None else now) < self.expires_at - self.margin
+
+    def invalidate(self):
+        """
+        Force the token to be refreshed the next time it is needed (like after it has been revoked).
+        """
+        self.expires_at = None
+
+    def refresh(self):
+        """
+        Get a new access token.
+
+        :return: A tuple of the new access token and the amount of seconds it is valid
+        """
+        if self._refresh is None:
+            raise NotImplementedError("No refresh callable was specified")
+        return self._refresh()
+
+    async def refresh_async(self):
+        """
+        Get a new access token, without blocking the event loop.
+
+        :return: A tuple of the new access token and the amount of seconds it is valid
+        """
+        if self._refresh_async is not None:
+            return await self._refresh_async()
+        return await asyncio.get_running_loop().run_in_executor(None, self.refresh)
+
+    def _store(self, result, now):
+        token, expires_in = result
+        self.token = token
+        self.expires_at = now + expires_in
+        self.refresh_count += 1
+        return token
+
+    def get_token(self) -> str:
+        if self.is_valid():
+            return self.token
+        with self._lock:
+            # Someone else may have refreshed it while we were waiting for the lock
+            if self.is_valid():
+                return self.token
+            now = time.time()
+            return self._store(self.refresh(), now)
+
+    async def get_token_async(self) -> str:
+        if self.is_valid():
+            return self.token
+        async with self._async_locks.get():
+            if self.is_valid():
+                return self.token
+            if self._refresh_async is None and type(self).refresh_async is TokenProvider.refresh_async:
+                # Refresh in the executor under the lock of `get_token`, shared with sync clients and other loops
+                return await asyncio.get_running_loop().run_in_executor(None, self.get_token)
+            now = time.time()
+            return self._store(await self.refresh_async(), now)
+
+    def __call__(self):
+        return self.get_token()
+
+    def __repr__(self):
+        return '<%s: %s>' % (self.__class__.__name__, self.identity)
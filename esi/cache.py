@@ -0,0 +1,439 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import struct
+import tempfile
+import time
+import zlib
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from threading import Lock, local
+from typing import Any, Dict, Optional, Tuple
+
+from httpx import Headers
+
+# The header of the files of a `FileSystemCache`: the compression flag and the length of the pickled validators
+HEADER = struct.Struct('>cI')
+
+
+def parse_http_date(value) -> Optional[float]:
+    """
+    Parse a HTTP date header into a timestamp, or None if it is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def get_expiry(headers, now=None) -> Optional[float]:
+    """
+    Get the local timestamp at which a response expires, based on its `Expires` header.
+
+    The lifetime is taken relative to the `Date` header of the response, so any clock skew between us and the server
+    does not affect how long the response is considered fresh.
+
+    :param headers: The response headers
+    :param now: The local timestamp the response was received at
+    :return: The local expiry timestamp, or None if the response does not expire
+    """
+    now = time.time() if now is None else now
+    expires = parse_http_date(headers.get('Expires'))
+    if expires is None:
+        return None
+    date = parse_http_date(headers.get('Date'))
+    if date is None:
+        date = now
+    return now + max(expires - date, 0)
+
+
+def is_fresh(expires, now=None) -> bool:
+    if expires is None:
+        return False
+    return (time.time() if now is None else now) < expires
+
+
+class CacheEntry:
+    """
+    A single cached response, containing the already converted payload.
+    """
+    __slots__ = ('etag', 'status_code', 'data', 'headers', 'expires')
+
+    def __init__(self, etag, status_code, data, headers, expires=None):
+        self.etag = etag  # type: str
+        self.status_code = status_code  # type: int
+        self.data = data  # type: Any
+        self.headers = headers
+        self.expires = expires  # type: float
+
+    def is_fresh(self, now=None) -> bool:
+        return is_fresh(self.expires, now)
+
+    def to_bytes(self, compress=False) -> bytes:
+        data = pickle.dumps((self.etag, self.status_code, self.data, list(self.headers.items()), self.expires),
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        if compress:
+            data = zlib.compress(data)
+        return data
+
+    @classmethod
+    def from_bytes(cls, data: bytes, compressed=False) -> 'CacheEntry':
+        if compressed:
+            data = zlib.decompress(data)
+        etag, status_code, value, headers, expires = pickle.loads(data)
+        return cls(etag, status_code, value, Headers(headers), expires=expires)
+
+    def __repr__(self):
+        return '<%s: %d %s>' % (self.__class__.__name__, self.status_code, self.etag)
+
+
+class BaseCache:
+    """
+    The interface for response caches used by the clients.
+
+    Entries are stored per request key, and contain the ETag, expiry and converted payload of a response. If
+    `honors_expires` is set, entries that have not expired yet are served without contacting the server.
+    """
+    honors_expires = False
+
+    def get(self, key) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def get_validators(self, key) -> Optional[Tuple[Optional[str], Optional[float]]]:
+        """
+        Get the ETag and expiry of the entry for the key, without loading its payload.
+
+        :return: A tuple of the ETag and expiry, or None if there is no entry for the key
+        """
+        entry = self.get(key)
+        if entry is None:
+            return None
+        return entry.etag, entry.expires
+
+    def get_fresh(self, key, now=None, validators=None) -> Optional[CacheEntry]:
+        """
+        Get the entry for the key if it can be served without contacting the server.
+
+        :param validators: The ETag and expiry of the entry, if they were looked up already
+        """
+        if not self.honors_expires:
+            return None
+        if validators is None:
+            validators = self.get_validators(key)
+        if validators is None or not is_fresh(validators[1], now):
+            return None
+        return self.get(key)
+
+    def set(self, key, entry: CacheEntry):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+
+class ETagCache(BaseCache):
+    """
+    Stores the last seen ETag and converted payload per request key, so that requests can be revalidated with
+    `If-None-Match` instead of being downloaded and converted again.
+
+    Entries are never evicted, use a `MemoryCache` to bound the amount of entries kept.
+    """
+    def __init__(self):
+        self._entries = {}  # type: Dict[str, CacheEntry]
+        self._lock = Lock()
+
+    def get(self, key) -> Optional[CacheEntry]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def set(self, key, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class MemoryCache(ETagCache):
+    """
+    A bounded in-memory cache that serves responses until they expire, as indicated by their `Expires` header.
+
+    When full, the least recently used entry is evicted. Expired entries are kept around (until evicted), as they can
+    still be revalidated with their ETag.
+    """
+    honors_expires = True
+
+    def __init__(self, max_size=1000, honors_expires=True):
+        """
+        :param max_size: The maximum amount of entries to keep, or None for no limit
+        :param honors_expires: True to serve entries that have not expired without contacting the server, False to
+                               only use the entries for conditional requests
+        """
+        super().__init__()
+        self.max_size = max_size
+        self.honors_expires = honors_expires
+        self._entries = OrderedDict()  # type: Dict[str, CacheEntry]
+
+    def get(self, key) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while self.max_size and len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class SQLiteCache(BaseCache):
+    """
+    A persistent cache stored in a SQLite database, which can be shared by all processes on a host. A restarted
+    process continues with the entries stored earlier.
+
+    When full, the least recently stored entry is evicted. Use `purge_expired` to remove the entries that expired.
+
+    Entries are pickled, so only point this at a database that is not writable by untrusted parties.
+    """
+    honors_expires = True
+
+    def __init__(self, path, compress=False, honors_expires=True, timeout=30, max_size=10000, max_age=None):
+        """
+        :param path: The path to the database file
+        :param compress: True to compress the stored entries
+        :param honors_expires: True to serve entries that have not expired without contacting the server
+        :param timeout: The amount of seconds to wait for other processes to release the database
+        :param max_size: The maximum amount of entries to keep, or None for no limit
+        :param max_age: The amount of seconds to keep entries around for revalidation after they expired, or None to
+                        keep them until they are evicted
+        """
+        self.path = path
+        self.compress = compress
+        self.honors_expires = honors_expires
+        self.timeout = timeout
+        self.max_size = max_size
+        self.max_age = max_age
+        self._local = local()
+        with self.connection as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS esi_cache ("
+                         "key TEXT PRIMARY KEY, etag TEXT, expires REAL, stored REAL, compressed INTEGER, entry BLOB)")
+            conn.execute("CREATE INDEX IF NOT EXISTS esi_cache_stored ON esi_cache (stored)")
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # sqlite connections can not be shared between threads, so use one per thread
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            conn = self._local.connection = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, key) -> Optional[CacheEntry]:
+        row = self.connection.execute("SELECT compressed, entry FROM esi_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return CacheEntry.from_bytes(row[1], compressed=bool(row[0]))
+
+    def get_validators(self, key):
+        row = self.connection.execute("SELECT etag, expires FROM esi_cache WHERE key = ?", (key,)).fetchone()
+        return tuple(row) if row is not None else None
+
+    def set(self, key, entry: CacheEntry):
+        with self.connection as conn:
+            conn.execute("INSERT OR REPLACE INTO esi_cache (key, etag, expires, stored, compressed, entry) "
+                         "VALUES (?, ?, ?, ?, ?, ?)",
+                         (key, entry.etag, entry.expires, time.time(), int(self.compress),
+                          entry.to_bytes(self.compress)))
+            if self.max_size:
+                conn.execute("DELETE FROM esi_cache WHERE key IN "
+                             "(SELECT key FROM esi_cache ORDER BY stored DESC LIMIT -1 OFFSET ?)", (self.max_size,))
+
+    def delete(self, key):
+        with self.connection as conn:
+            conn.execute("DELETE FROM esi_cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self.connection as conn:
+            conn.execute("DELETE FROM esi_cache")
+
+    def purge_expired(self, now=None):
+        """
+        Remove all entries that have expired and can not be revalidated, or expired more than `max_age` seconds ago.
+        """
+        now = time.time() if now is None else now
+        oldest = now - self.max_age if self.max_age is not None else None
+        with self.connection as conn:
+            conn.execute("DELETE FROM esi_cache WHERE expires < ? AND (etag IS NULL OR expires < ?)", (now, oldest))
+
+    def close(self):
+        conn = getattr(self._local, 'connection', None)
+        if conn is not None:
+            conn.close()
+            self._local.connection = None
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM esi_cache").fetchone()[0]
+
+
+class FileSystemCache(BaseCache):
+    """
+    A persistent cache storing every entry in its own file, in a directory sharded by the hash of the key. It can be
+    shared by all processes on a host, and a restarted process continues with the entries stored earlier.
+
+    When full, the least recently stored entries are evicted. As that walks the entire directory, the size is only
+    checked every `evict_interval` writes, so the cache can briefly hold a few more entries than `max_size`. Use
+    `purge_expired` to remove the entries that expired.
+
+    Entries are pickled, so only point this at a directory that is not writable by untrusted parties.
+    """
+    honors_expires = True
+    suffix = '.cache'
+    #: The amount of entries written between checks of the size of the cache
+    evict_interval = 100
+
+    def __init__(self, directory, compress=False, honors_expires=True, shard_depth=2, max_size=10000, max_age=None):
+        """
+        :param directory: The directory to store the entries in
+        :param compress: True to compress the stored entries
+        :param honors_expires: True to serve entries that have not expired without contacting the server
+        :param shard_depth: The amount of directory levels to spread the entries over
+        :param max_size: The maximum amount of entries to keep, or None for no limit
+        :param max_age: The amount of seconds to keep entries around for revalidation after they expired, or None to
+                        keep them until they are evicted
+        """
+        self.directory = directory
+        self.compress = compress
+        self.honors_expires = honors_expires
+        self.shard_depth = shard_depth
+        self.max_size = max_size
+        self.max_age = max_age
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, key):
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        shards = [digest[x * 2:x * 2 + 2] for x in range(self.shard_depth)]
+        return os.path.join(self.directory, *shards, digest + self.suffix)
+
+    def read_header(self, fh):
+        # The first byte marks whether the entry is compressed, followed by the length of the pickled ETag and expiry
+        flag, length = HEADER.unpack(fh.read(HEADER.size))
+        return flag == b'z', pickle.loads(fh.read(length))
+
+    def get(self, key) -> Optional[CacheEntry]:
+        try:
+            with open(self.get_path(key), 'rb') as fh:
+                compressed, _ = self.read_header(fh)
+                data = fh.read()
+        except Exception:
+            # A corrupt entry is no different from a missing one
+            return None
+        try:
+            return CacheEntry.from_bytes(data, compressed=compressed)
+        except Exception:
+            return None
+
+    def get_validators(self, key):
+        try:
+            with open(self.get_path(key), 'rb') as fh:
+                return self.read_header(fh)[1]
+        except Exception:
+            return None
+
+    def set(self, key, entry: CacheEntry):
+        path = self.get_path(key)
+        dirname = os.path.dirname(path)
+        os.makedirs(dirname, exist_ok=True)
+        # Write to a temporary file first, so other processes never see a partially written entry
+        fd, tmp = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+        try:
+            validators = pickle.dumps((entry.etag, entry.expires), protocol=pickle.HIGHEST_PROTOCOL)
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(HEADER.pack(b'z' if self.compress else b'p', len(validators)))
+                fh.write(validators)
+                fh.write(entry.to_bytes(self.compress))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._writes += 1
+        if self.max_size and self._writes % self.evict_interval == 0:
+            self.evict()
+
+    def delete(self, key):
+        self.remove(self.get_path(key))
+
+    def iter_paths(self):
+        for dirpath, dirnames, filenames in os.walk(self.directory):
+            for fname in filenames:
+                if fname.endswith(self.suffix):
+                    yield os.path.join(dirpath, fname)
+
+    def remove(self, path):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for path in self.iter_paths():
+            self.remove(path)
+
+    def evict(self):
+        """
+        Remove the least recently stored entries beyond `max_size`.
+        """
+        stored = []
+        for path in self.iter_paths():
+            try:
+                stored.append((os.stat(path).st_mtime, path))
+            except FileNotFoundError:
+                pass
+        stored.sort(reverse=True)
+        for _, path in stored[self.max_size:]:
+            self.remove(path)
+
+    def purge_expired(self, now=None):
+        """
+        Remove all entries that have expired and can not be revalidated, or expired more than `max_age` seconds ago.
+        """
+        now = time.time() if now is None else now
+        for path in self.iter_paths():
+            try:
+                with open(path, 'rb') as fh:
+                    etag, expires = self.read_header(fh)[1]
+            except FileNotFoundError:
+                continue
+            except Exception:
+                # A corrupt entry is of no use
+                self.remove(path)
+                continue
+            if expires is not None and expires < now and (
+                    etag is None or (self.max_age is not None and expires < now - self.max_age)):
+                self.remove(path)
+
+    def __len__(self):
+        return sum(1 for _ in self.iter_paths())
@@ -1,21 +1,83 @@
-from asyncio import wait, ALL_COMPLETED, create_task
+import time
+import warnings
+from asyncio import wait, gather, sleep, FIRST_COMPLETED, Lock, create_task
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-from httpx import Client as _Client, AsyncClient as _AsyncClient, URL
+from httpx import Client as _Client, AsyncClient as _AsyncClient, PoolLimits, URL
+from httpx._dispatch.connection import HTTPConnection
+from httpx._dispatch.connection_pool import ConnectionPool
+from httpx._dispatch.http2 import HTTP2Connection
 
-from esi.exceptions import ESIScopeRequired
-from esi.utils import USER_AGENT
+from esi.cache import BaseCache, MemoryCache, CacheEntry, get_expiry
+from esi.exceptions import ESIScopeRequired, ESIResponseError
+from esi.retry import RetryPolicy, RETRYABLE_EXCEPTIONS
+from esi.singleflight import SingleFlight, AsyncSingleFlight
+from esi.spec.columnar import Columns, get_flat_properties, use_numpy
+from esi.spec.function import VALIDATION_SHALLOW
+from esi.stream import iter_json_array, aiter_json_array
+from esi.throttle import ErrorLimitThrottle, RateLimiter
+from esi.utils import USER_AGENT, PerLoop, try_int
 
 
 class ESIClientBase:
-    def __init__(self, esi, **kwargs):
+    single_flight_class = None
+    #: The amount of responses kept by the default cache, the least recently used ones are evicted beyond that
+    default_cache_size = 1000
+
+    def __init__(self, esi, *, cache=True, throttle=True, coalesce=True, retry=True, rate_limiter=None, lazy=False,
+                 columnar=False, epoch=False, **kwargs):
+        """
+        :param esi: The ESI instance to make the requests for, unless a request is made for another one
+        :param cache: The cache used for conditional requests. `True` to create a new `MemoryCache` of
+                      `default_cache_size` entries that is only used for conditional requests, or `None`/`False` to
+                      disable conditional requests altogether. Pass a `MemoryCache` (or a persistent cache like
+                      `SQLiteCache` or `FileSystemCache`) to also serve responses that have not expired yet without
+                      contacting the server.
+        :param throttle: The `ErrorLimitThrottle` to slow down with as the error budget runs out. `True` to create a
+                         new one, or `None`/`False` to disable throttling.
+        :param coalesce: True to let identical requests that are in flight at the same time share a single request
+                         and result.
+        :param retry: The `RetryPolicy` for failed requests. `True` to use the default policy, or `None`/`False` to
+                      never retry.
+        :param rate_limiter: The `RateLimiter` with the per route limits to keep to, requests exceeding them wait
+                             before they are sent.
+        :param lazy: True to return lazy views on the response data, which only convert the fields that are accessed.
+                     Use `esi.spec.lazy.materialize` to convert them entirely.
+        :param columnar: True to return arrays of flat objects (like market orders) as `Columns`, with a column per
+                         property rather than a dict per row. Pass 'numpy' to require NumPy arrays for the columns,
+                         which raises a `MissingPackageError` right away when NumPy is not installed.
+        :param epoch: True to convert dates and date-times to seconds since the epoch, rather than datetimes.
+        """
         self.esi = esi
+        if cache is True:
+            cache = MemoryCache(max_size=self.default_cache_size, honors_expires=False)
+        elif cache is False:
+            cache = None
+        self.cache = cache  # type: BaseCache
+        if throttle is True:
+            throttle = ErrorLimitThrottle()
+        elif throttle is False:
+            throttle = None
+        self.throttle = throttle  # type: ErrorLimitThrottle
+        self.single_flight = self.single_flight_class() if coalesce else None
+        if retry is True:
+            retry = RetryPolicy()
+        elif retry is False:
+            retry = None
+        self.retry = retry  # type: RetryPolicy
+        self.rate_limiter = rate_limiter  # type: RateLimiter
+        self.lazy = lazy
+        if columnar == 'numpy':
+            # Fail right away rather than on the first response when NumPy is missing
+            use_numpy(True)
+        self.columnar = columnar
+        self.epoch = epoch
+        # The authorization is added per request, so the connection pool can be shared by multiple characters
         hdrs = {
             'user-agent': esi.user_agent or USER_AGENT,
         }
-        if esi.auth_token:
-            token = esi.auth_token() if callable(esi.auth_token) else esi.auth_token
-            if token:
-                hdrs['Authorization'] = 'Bearer %s' % token
         hdrs.update(kwargs.get("headers", {}))
         kwargs["headers"] = hdrs
         super().__init__(**kwargs)
@@ -23,23 +85,31 @@ class ESIClientBase:
     def __call__(self, request, **kwargs):
         return self.send(request **kwargs)
 
-    def validate_esi_request(self, request):
+    def bind(self, esi):
+        """
+        Get a lightweight handle on this client, which sends all requests for the specified ESI instance.
+        """
+        return BoundClient(self, esi)
+
+    def validate_esi_request(self, request, esi=None):
         from esi.spec import Function
         if not isinstance(request, Function):
             return
+        esi = esi or self.esi
         # If scope validation is requested, we do this before we send.
-        if not request.validate_scopes(self.esi.enabled_scopes or []):
+        if not request.validate_scopes(esi.enabled_scopes or []):
             raise ESIScopeRequired(request.scopes)
 
-    def prepare_esi_request(self, request):
+    def prepare_esi_request(self, request, esi=None):
         from esi.spec import Function
-        if not isinstance(request, Function):
+        if not isinstance(request, Function) or request.prepared:
             return
+        esi = esi or self.esi
         # Prepare the request for sending.
         # Since we don't include the host/base url in the requests, we join it here
         if request.url.scheme not in ("http", "https") or not request.url.host:
-            new_path = '/'.join([self.esi.base_path.rstrip('/'), request.url.path.lstrip('/')])
-            request.url = url = request.url.copy_with(scheme=self.esi.get_scheme(), host=self.esi.host, path=new_path)
+            new_path = '/'.join([esi.base_path.rstrip('/'), request.url.path.lstrip('/')])
+            request.url = url = request.url.copy_with(scheme=esi.get_scheme(), host=esi.host, path=new_path)
             # Make sure to update the Host header to the proper value as well
             if url.userinfo:
                 # Ensure we don't include any form of credentials in the host header.
@@ -50,58 +120,702 @@ class ESIClientBase:
         for key, val in self.headers.items():
             request.headers.setdefault(key, val)
 
+        # Authenticate as the requested identity, unless the request was authenticated for one before
+        if not request.authenticated:
+            self.authenticate_esi_request(request, esi, esi.get_auth_token())
+        request.prepared = True
+
+    def get_cache_key(self, request):
+        """
+        Get the key a request is cached under, or None if the request can not be cached.
+
+        The key consists of the method and the canonical url, which is the url with its query parameters sorted. For
+        requests that require scopes, the identity the request is made with is included as well. Those are not
+        cached without a stable identity, as they could otherwise be served to another character. Responses are
+        cached converted, so clients converting them differently (see `get_conversion_key`) use keys of their own.
+        """
+        from esi.spec import Function
+        if not isinstance(request, Function) or request.method != "GET":
+            return None
+        url = request.url
+        query = '&'.join(sorted(url.query.split('&'))) if url.query else ''
+        key = '%s %s://%s%s?%s' % (request.method, url.scheme, url.authority, url.path, query)
+        conversion = self.get_conversion_key()
+        if conversion:
+            key = '%s (%s)' % (key, conversion)
+        if request.scopes:
+            identity = self.get_auth_identity(request)
+            if identity is None:
+                return None
+            key = '%s %s' % (key, identity)
+        return key
+
+    def get_conversion_key(self):
+        """
+        Get how this client converts the response data, or an empty string for the default conversion.
+        """
+        modes = []
+        if self.lazy:
+            modes.append('lazy')
+        if self.columnar:
+            modes.append('columnar' if self.columnar is True else 'columnar=%s' % self.columnar)
+        if self.epoch:
+            modes.append('epoch')
+        return ','.join(modes)
+
+    def authenticate_esi_request(self, request, esi, token):
+        """
+        Mark the request as being made by the identity of the ESI instance, using the specified access token.
+        """
+        request.identity = esi.get_identity()
+        request.authenticated = True
+        if token:
+            request.headers["Authorization"] = 'Bearer %s' % token
+
+    def get_auth_identity(self, request):
+        """
+        Get the identity a (prepared) request is made with.
+        """
+        return request.identity
+
+    def get_coalesce_key(self, request):
+        """
+        Get the key identical in-flight requests are coalesced by, or None if the request should not be coalesced.
+        """
+        if self.single_flight is None:
+            return None
+        key = self.get_cache_key(request)
+        if key is None:
+            return None
+        return key, self.get_auth_identity(request)
+
+    def get_cache_entry(self, request):
+        if self.cache is None:
+            return None
+        key = self.get_cache_key(request)
+        if key is None:
+            return None
+        return self.cache.get(key)
+
+    def check_cache(self, request):
+        """
+        Look up a (prepared) request in the cache. Returns the cached entry if it has not expired yet, so it can be
+        served without a request. Otherwise the request is made conditional on the ETag of the cached entry, if any.
+
+        Only the ETag and expiry are looked up, the payload of the entry is only loaded once it is served.
+        """
+        if self.cache is None:
+            return None
+        key = self.get_cache_key(request)
+        if key is None:
+            return None
+        validators = self.cache.get_validators(key)
+        if validators is None:
+            return None
+        entry = self.cache.get_fresh(key, validators=validators)
+        if entry is not None:
+            return entry
+        etag = validators[0]
+        if etag:
+            request.headers.setdefault("If-None-Match", etag)
+        return None
+
     def process_esi_repsonse(self, request, response, raise_if_error=None):
         status_code = response.status_code
         schema = request.responses.get(status_code)
         headers = response.headers
 
         if response.status_code == 304:
+            entry = self.get_cache_entry(request)
+            if entry is not None and entry.etag == request.headers.get("If-None-Match"):
+                # Not modified, so serve the payload we converted earlier with the refreshed headers
+                entry.headers = entry.headers.copy()
+                entry.headers.update(headers)
+                entry.expires = get_expiry(entry.headers)
+                # Persistent caches return a copy, so store the refreshed expiry for the next lookup
+                self.cache.set(self.get_cache_key(request), entry)
+                return entry.status_code, entry.data, entry.headers
             data = None
         else:
             data = response.json()
             if schema:
-                data = schema.to_python(data)
-        
+                data = self.convert_esi_data(schema, data)
+            self.store_cache_entry(request, status_code, data, headers)
+
         return status_code, data, headers
 
+    def convert_esi_data(self, described, data):
+        if self.columnar and get_flat_properties(described) is not None:
+            return described.to_columns(data, with_numpy=True if self.columnar == 'numpy' else None)
+        if self.lazy:
+            return described.to_lazy(data, self.epoch)
+        return described.to_python(data, self.epoch)
+
+    def get_item_schema(self, request, status_code):
+        """
+        Get the schema of the items of an array response, or None if the response is not an array.
+        """
+        schema = request.responses.get(status_code)
+        if schema is None or schema.python_type is not list:
+            return None
+        return schema.items
+
+    def store_cache_entry(self, request, status_code, data, headers):
+        if self.cache is None or status_code != 200:
+            return
+        key = self.get_cache_key(request)
+        if key is None:
+            return
+        etag = headers.get("ETag")
+        expires = get_expiry(headers) if self.cache.honors_expires else None
+        if not etag and expires is None:
+            return
+        self.cache.set(key, CacheEntry(etag, status_code, data, headers, expires=expires))
+
+    def get_retry_delay(self, request, attempt, response=None, retry_budget=None):
+        """
+        Get the amount of seconds to wait before retrying a failed request, or None if it should not be retried.
+
+        :param request: The request that failed
+        :param attempt: The amount of retries made so far
+        :param response: The response, or None if the request failed without one
+        :param retry_budget: The `RetryBudget` of the batch the request is part of, if any
+        """
+        if self.retry is None or not self.retry.should_retry(request, attempt, response):
+            return None
+        if retry_budget is not None and not retry_budget.consume():
+            return None
+        return self.retry.get_delay(attempt, response)
+
+    def new_retry_budget(self, size):
+        if self.retry is None:
+            return None
+        return self.retry.new_budget(size)
+
+    def get_page_requests(self, request, headers):
+        """
+        Build the requests for the remaining pages of a paged request, based on the `X-Pages` header of its response.
+
+        Functions without a page parameter have no other pages to request.
+        """
+        if not request.has_param("page"):
+            return []
+        pages = try_int(headers.get("X-Pages"), 1) or 1
+        page = request.arguments.get("page") or 1
+        # The other arguments were validated for the first page already
+        return [request.copy_with(page=x, esi_validation=VALIDATION_SHALLOW) for x in range(page + 1, pages + 1)]
+
+    def merge_results(self, results):
+        """
+        Merge the results of multiple requests returning lists (like the pages of a paged request) in order into a
+        single result.
+
+        :raises ESIResponseError: If any of the requests did not return successfully
+        """
+        status_code, _, headers = results[0]
+        merged = None
+        for page_status, page_data, page_headers in results:
+            if page_status != 200:
+                raise ESIResponseError(page_status, page_data, page_headers)
+            if merged is None:
+                merged = page_data.copy() if isinstance(page_data, Columns) else list(page_data or [])
+            else:
+                merged.extend(page_data or [])
+        return status_code, merged, headers
+
 
 class Client(ESIClientBase, _Client):
+    single_flight_class = SingleFlight
+    max_concurrency = 10
+
     def send(self, request, **kwargs):
         # `validate_esi_request` is a noop if the request is not a Function subclass
         if kwargs.pop("validate_scopes", True):
             self.validate_esi_request(request)
         # `prepare_esi_request` is a noop if the request is not a Function subclass
-        self.prepare_esi_request(request)                            
-        return super().send(request, **kwargs)
+        self.prepare_esi_request(request)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(request)
+        if self.throttle is None:
+            return super().send(request, **kwargs)
+        with self.throttle:
+            response = super().send(request, **kwargs)
+            self.throttle.update(response.headers)
+        return response
+
+    def send_esi_request(self, request, *, raise_if_error=None, validate_scopes=True, esi=None, **kwargs):
+        if validate_scopes:
+            self.validate_esi_request(request, esi)
+        self.prepare_esi_request(request, esi)
+        entry = self.check_cache(request)
+        if entry is not None:
+            return entry.status_code, entry.data, entry.headers
+        key = self.get_coalesce_key(request)
+        if key is None:
+            return self._send_esi_request(request, raise_if_error=raise_if_error, **kwargs)
+        return self.single_flight.do(key, lambda: self._send_esi_request(request, raise_if_error=raise_if_error,
+                                                                         **kwargs))
+
+    def _send_esi_request(self, request, *, raise_if_error=None, retry_budget=None, stream=False, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                resp = self.send(request, validate_scopes=False, stream=stream, **kwargs)
+            except RETRYABLE_EXCEPTIONS:
+                delay = self.get_retry_delay(request, attempt, retry_budget=retry_budget)
+                if delay is None:
+                    raise
+            else:
+                delay = self.get_retry_delay(request, attempt, resp, retry_budget=retry_budget)
+                if delay is None:
+                    if stream:
+                        return resp
+                    return self.process_esi_repsonse(request, resp, raise_if_error=raise_if_error)
+                if stream:
+                    resp.close()
+            attempt += 1
+            time.sleep(delay)
+
+    def stream_esi_request(self, request, *, validate_scopes=True, esi=None, **kwargs):
+        """
+        Send a request returning a (large) array, and yield its items as they are received, decoding and converting
+        them one at a time rather than holding the entire response in memory.
+
+        Streamed responses are not stored in the cache, nor are identical requests coalesced.
+
+        :raises ESIResponseError: If the request did not return successfully
+        """
+        if validate_scopes:
+            self.validate_esi_request(request, esi)
+        self.prepare_esi_request(request, esi)
+        entry = self.check_cache(request)
+        if entry is not None:
+            yield from entry.data
+            return
+        resp = self._send_esi_request(request, stream=True, **kwargs)
+        try:
+            if resp.status_code != 200:
+                resp.read()
+                status_code, data, headers = self.process_esi_repsonse(request, resp)
+                if status_code != 200:
+                    raise ESIResponseError(status_code, data, headers)
+                # Not modified, so serve the items we have cached
+                yield from data
+                return
+            schema = self.get_item_schema(request, resp.status_code)
+            for item in iter_json_array(resp.iter_bytes(), resp.charset_encoding or 'utf-8'):
+                yield self.convert_esi_data(schema, item) if schema is not None else item
+        finally:
+            resp.close()
 
-    def send_esi_request(self, request, *, raise_if_error=None, validate_scopes=True, **kwargs):
-        resp = self.send(request, **kwargs)
-        return self.process_esi_repsonse(request, resp, raise_if_error=raise_if_error)
+    def __call__(self, *requests, raise_if_error=None, validate_scopes=True, max_concurrency=None,
+                 return_exceptions=False, **kwargs):
+        """
+        Send the requests, at most `max_concurrency` at a time, and return the results in the order of the requests.
+        """
+        return self.batch(requests, raise_if_error=raise_if_error, validate_scopes=validate_scopes,
+                          max_concurrency=max_concurrency, return_exceptions=return_exceptions, **kwargs)
 
-    def __call__(self, *requests, raise_if_error=None, validate_scopes=True, **kwargs):
-        return [
-            self.send_esi_request(request, raise_if_error=raise_if_error, validate_scopes=validate_scopes, **kwargs)
-            for request in requests
-        ]
+    def batch(self, requests, *, max_concurrency=None, return_exceptions=False, **kwargs):
+        """
+        Send a batch of requests in parallel on a bounded pool of threads, sharing the connection pool of this client.
+
+        :param requests: The requests to send
+        :param max_concurrency: The maximum amount of requests in flight, defaults to `max_concurrency`. Use 1 to send
+                                the requests one after another in the calling thread.
+        :param return_exceptions: True to put the exception raised by a request in its place in the results, rather
+                                  than aborting the entire batch
+        :return: The results, in the same order as the requests
+        """
+        requests = list(requests)
+        workers = min(max_concurrency or self.max_concurrency, len(requests))
+        kwargs.setdefault('retry_budget', self.new_retry_budget(len(requests)))
+
+        def send(request):
+            try:
+                return self.send_esi_request(request, **kwargs)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return e
+
+        if workers <= 1:
+            return [send(request) for request in requests]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(send, request) for request in requests]
+            try:
+                return [future.result() for future in futures]
+            finally:
+                # Don't bother sending the remaining requests when aborting
+                for future in futures:
+                    future.cancel()
+
+    def get_all_pages(self, request, *, max_concurrency=10, **kwargs):
+        """
+        Fetch all pages of a paged request, fetching the pages after the first one concurrently.
+
+        :param request: The request for the first page to fetch
+        :param max_concurrency: The maximum amount of pages to fetch at the same time
+        :return: The status code and headers of the first page, with the data of all pages merged in page order
+        """
+        first = self.send_esi_request(request, **kwargs)
+        if first[0] != 200:
+            raise ESIResponseError(*first)
+        rest = self.batch(self.get_page_requests(request, first[2]), max_concurrency=max_concurrency, **kwargs)
+        return self.merge_results([first] + rest)
+
+    def bulk(self, function, values, *, arguments=None, max_concurrency=10, **kwargs):
+        """
+        Send any amount of values to a function taking an array body (like `post_universe_names`), by splitting them
+        into chunks allowed by the spec and sending those concurrently.
+
+        :param function: The Function subclass to call
+        :param values: The values to send, duplicates are removed
+        :param arguments: Any other arguments for the function
+        :param max_concurrency: The maximum amount of chunks to send at the same time
+        :return: The status code and headers of the first chunk, with the data of all chunks merged in order
+        """
+        requests = function.bulk_requests(values, **(arguments or {}))
+        if not requests:
+            return 200, [], None
+        results = self.batch(requests, max_concurrency=max_concurrency, **kwargs)
+        return self.merge_results(results)
 
 
 class AsyncClient(ESIClientBase, _AsyncClient):
+    single_flight_class = AsyncSingleFlight
+    max_concurrency = 20
+
     async def send(self, request, **kwargs):
         # `validate_esi_request` is a noop if the request is not a Function subclass
         if kwargs.pop("validate_scopes", True):
             self.validate_esi_request(request)
         # `prepare_esi_request` is a noop if the request is not a Function subclass
-        self.prepare_esi_request(request)                            
+        self.prepare_esi_request(request)
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(request)
+        if self.throttle is None:
+            return await super().send(request, **kwargs)
+        async with self.throttle:
+            response = await super().send(request, **kwargs)
+            self.throttle.update(response.headers)
+        return response
+
+    async def send_esi_request(self, request, *, raise_if_error=None, validate_scopes=True, esi=None, **kwargs):
+        from esi.spec import Function
+        if validate_scopes:
+            self.validate_esi_request(request, esi)
+        if isinstance(request, Function) and not request.authenticated:
+            # Get the token up front, so refreshing it does not block the event loop
+            esi = esi or self.esi
+            self.authenticate_esi_request(request, esi, await esi.get_auth_token_async())
+        self.prepare_esi_request(request, esi)
+        entry = self.check_cache(request)
+        if entry is not None:
+            return entry.status_code, entry.data, entry.headers
+        key = self.get_coalesce_key(request)
+        if key is None:
+            return await self._send_esi_request(request, raise_if_error=raise_if_error, **kwargs)
+        return await self.single_flight.do(key, lambda: self._send_esi_request(request, raise_if_error=raise_if_error,
+                                                                               **kwargs))
+
+    async def _send_esi_request(self, request, *, raise_if_error=None, retry_budget=None, stream=False, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                resp = await self.send(request, validate_scopes=False, stream=stream, **kwargs)
+            except RETRYABLE_EXCEPTIONS:
+                delay = self.get_retry_delay(request, attempt, retry_budget=retry_budget)
+                if delay is None:
+                    raise
+            else:
+                delay = self.get_retry_delay(request, attempt, resp, retry_budget=retry_budget)
+                if delay is None:
+                    if stream:
+                        return resp
+                    return self.process_esi_repsonse(request, resp, raise_if_error=raise_if_error)
+                if stream:
+                    await resp.aclose()
+            attempt += 1
+            await sleep(delay)
+
+    async def stream_esi_request(self, request, *, validate_scopes=True, esi=None, **kwargs):
+        """
+        Send a request returning a (large) array, and yield its items as they are received, decoding and converting
+        them one at a time rather than holding the entire response in memory.
+
+        Streamed responses are not stored in the cache, nor are identical requests coalesced.
+
+        :raises ESIResponseError: If the request did not return successfully
+        """
+        from esi.spec import Function
+        if validate_scopes:
+            self.validate_esi_request(request, esi)
+        if isinstance(request, Function) and not request.authenticated:
+            esi = esi or self.esi
+            self.authenticate_esi_request(request, esi, await esi.get_auth_token_async())
+        self.prepare_esi_request(request, esi)
+        entry = self.check_cache(request)
+        if entry is not None:
+            for item in entry.data:
+                yield item
+            return
+        resp = await self._send_esi_request(request, stream=True, **kwargs)
+        try:
+            if resp.status_code != 200:
+                await resp.aread()
+                status_code, data, headers = self.process_esi_repsonse(request, resp)
+                if status_code != 200:
+                    raise ESIResponseError(status_code, data, headers)
+                # Not modified, so serve the items we have cached
+                for item in data:
+                    yield item
+                return
+            schema = self.get_item_schema(request, resp.status_code)
+            async for item in aiter_json_array(resp.aiter_bytes(), resp.charset_encoding or 'utf-8'):
+                yield self.convert_esi_data(schema, item) if schema is not None else item
+        finally:
+            await resp.aclose()
+
+    async def __call__(self, *requests, raise_if_error=None, validate_scopes=True, return_when=None,
+                       max_concurrency=None, return_exceptions=False, **kwargs):
+        """
+        Send the requests, at most `max_concurrency` at a time, and return the results in the order of the requests.
+
+        Returns a single result when called with a single request, see `batch` to always get a list.
+        """
+        if return_when is not None:
+            warnings.warn(DeprecationWarning(
+                'The "return_when" argument is ignored, as all results are returned in order.'
+            ), stacklevel=2)
+        results = await self.batch(requests, raise_if_error=raise_if_error, validate_scopes=validate_scopes,
+                                   max_concurrency=max_concurrency, return_exceptions=return_exceptions, **kwargs)
+        return results if len(requests) > 1 else results[0]
+
+    async def batch(self, requests, *, max_concurrency=None, return_exceptions=False, **kwargs):
+        """
+        Send a batch of requests, with a bounded amount of requests in flight at the same time.
+
+        Rather than creating a task per request, a fixed amount of workers is started that each take the next request
+        once their current request is done.
+
+        :param requests: The requests to send
+        :param max_concurrency: The maximum amount of requests in flight, defaults to `max_concurrency`
+        :param return_exceptions: True to put the exception raised by a request in its place in the results, rather
+                                  than aborting the entire batch
+        :return: The results, in the same order as the requests
+        """
+        requests = list(requests)
+        results = [None] * len(requests)
+        queue = iter(enumerate(requests))
+        kwargs.setdefault('retry_budget', self.new_retry_budget(len(requests)))
+
+        async def worker():
+            for index, request in queue:
+                try:
+                    results[index] = await self.send_esi_request(request, **kwargs)
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results[index] = e
+
+        workers = [create_task(worker()) for _ in range(min(max_concurrency or self.max_concurrency, len(requests)))]
+        try:
+            await gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+        return results
+
+    async def get_all_pages(self, request, *, max_concurrency=10, **kwargs):
+        """
+        Fetch all pages of a paged request, fetching the pages after the first one concurrently.
+
+        :param request: The request for the first page to fetch
+        :param max_concurrency: The maximum amount of pages to fetch at the same time
+        :return: The status code and headers of the first page, with the data of all pages merged in page order
+        """
+        first = await self.send_esi_request(request, **kwargs)
+        if first[0] != 200:
+            raise ESIResponseError(*first)
+        rest = await self.batch(self.get_page_requests(request, first[2]), max_concurrency=max_concurrency, **kwargs)
+        return self.merge_results([first] + rest)
+
+    async def bulk(self, function, values, *, arguments=None, max_concurrency=10, **kwargs):
+        """
+        Send any amount of values to a function taking an array body (like `post_universe_names`), by splitting them
+        into chunks allowed by the spec and sending those concurrently.
+
+        :param function: The Function subclass to call
+        :param values: The values to send, duplicates are removed
+        :param arguments: Any other arguments for the function
+        :param max_concurrency: The maximum amount of chunks to send at the same time
+        :return: The status code and headers of the first chunk, with the data of all chunks merged in order
+        """
+        requests = function.bulk_requests(values, **(arguments or {}))
+        if not requests:
+            return 200, [], None
+        results = await self.batch(requests, max_concurrency=max_concurrency, **kwargs)
+        return self.merge_results(results)
+
+    async def iter_pages(self, request, *, max_concurrency=10, ordered=True, items=True, **kwargs):
+        """
+        Iterate over all pages of a paged request as they arrive, without keeping every page in memory.
+
+        At most `max_concurrency` pages are fetched (or held, waiting to be consumed) at the same time.
+
+        :param request: The request for the first page to fetch
+        :param max_concurrency: The maximum amount of pages to fetch at the same time
+        :param ordered: True to yield in page order, False to yield pages as soon as they are completed
+        :param items: True to yield the individual items, False to yield the data of each page as a whole
+        :raises ESIResponseError: If any of the pages did not return successfully
+        """
+        result = await self.send_esi_request(request, **kwargs)
+        if result[0] != 200:
+            raise ESIResponseError(*result)
+        page_requests = deque(self.get_page_requests(request, result[2]))
+        kwargs.setdefault('retry_budget', self.new_retry_budget(len(page_requests)))
+        pending = deque()
+        try:
+            while True:
+                # Keep the next pages downloading while the current one is being consumed
+                while page_requests and len(pending) < max_concurrency:
+                    pending.append(create_task(self.send_esi_request(page_requests.popleft(), **kwargs)))
+
+                status_code, data, headers = result
+                if status_code != 200:
+                    raise ESIResponseError(status_code, data, headers)
+                if items:
+                    for item in data or []:
+                        yield item
+                else:
+                    yield data
+
+                if not pending:
+                    break
+                if ordered:
+                    result = await pending.popleft()
+                else:
+                    done, _ = await wait(pending, return_when=FIRST_COMPLETED)
+                    task = done.pop()
+                    pending.remove(task)
+                    result = task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+class _HTTP2Connection(HTTP2Connection):
+    """
+    An HTTP2Connection letting a single stream at a time read from the socket.
+
+    Otherwise a stream waiting for its turn to read may still read after the stream before it already received its
+    response, and wait for data that never comes until the read times out.
+    """
+    @property
+    def read_lock(self):
+        if not hasattr(self, '_read_lock'):
+            self._read_lock = self.backend.create_lock()
+        return self._read_lock
+
+    async def wait_for_event(self, stream_id, timeout):
+        while not self.events[stream_id]:
+            async with self.read_lock:
+                if not self.events[stream_id]:
+                    await self.receive_events(timeout)
+        return self.events[stream_id].pop(0)
+
+
+class _HTTPConnection(HTTPConnection):
+    async def connect(self, timeout):
+        connection = await super().connect(timeout)
+        if isinstance(connection, HTTP2Connection):
+            connection = _HTTP2Connection(connection.socket, self.backend, on_release=connection.on_release)
+        return connection
+
+
+class _HTTP2ConnectionPool(ConnectionPool):
+    async def acquire_connection(self, origin, timeout=None):
+        connection = self.pop_connection(origin)
+        if connection is None:
+            await self.max_connections.acquire(timeout=None if timeout is None else timeout.pool_timeout)
+            connection = _HTTPConnection(origin, ssl=self.ssl, backend=self.backend,
+                                         release_func=self.release_connection, uds=self.uds)
+        self.active_connections.add(connection)
+        return connection
+
+
+class HTTP2AsyncClient(AsyncClient):
+    """
+    An AsyncClient that multiplexes its requests as streams over a few HTTP/2 connections, rather than opening a
+    connection per concurrent request.
+    """
+    #: The amount of connections to keep open per host, each carrying many concurrent streams
+    max_connections = 4
+    max_concurrency = 100
+
+    def __init__(self, esi, *, http2=True, pool_limits=None, **kwargs):
+        if pool_limits is None:
+            # Only keep a few connections around, but don't make requests wait for a connection: HTTP/2 connections
+            # never give their permit back, so requests waiting for one would wait until the pool times out.
+            pool_limits = PoolLimits(soft_limit=self.max_connections, hard_limit=None)
+        super().__init__(esi, http2=http2, pool_limits=pool_limits, **kwargs)
+        self._warmup_locks = PerLoop(Lock)
+        self._warmed_up = False
+
+    def init_dispatch(self, verify=True, cert=None, http2=False, pool_limits=None, dispatch=None, app=None,
+                      trust_env=True, uds=None):
+        if dispatch is None and app is None:
+            dispatch = _HTTP2ConnectionPool(verify=verify, cert=cert, trust_env=trust_env, pool_limits=pool_limits,
+                                            http2=http2, uds=uds)
+        return super().init_dispatch(verify=verify, cert=cert, http2=http2, pool_limits=pool_limits,
+                                     dispatch=dispatch, app=app, trust_env=trust_env, uds=uds)
+
+    async def send(self, request, **kwargs):
+        if not self._warmed_up:
+            # Until a connection has negotiated HTTP/2, concurrent requests can't share it and would each open a
+            # connection of their own. So send the first request alone, and let the others wait for it.
+            async with self._warmup_locks.get():
+                if not self._warmed_up:
+                    response = await super().send(request, **kwargs)
+                    self._warmed_up = True
+                    return response
         return await super().send(request, **kwargs)
 
-    async def send_esi_request(self, request, *, raise_if_error=None, **kwargs):
-        resp = await self.send(request, **kwargs)
-        return self.process_esi_repsonse(request, resp, raise_if_error=raise_if_error)
-
-    async def __call__(self, *requests, raise_if_error=None, validate_scopes=True, return_when=ALL_COMPLETED, **kwargs):
-        done, pending = await wait([
-            create_task(self.send_esi_request(request, raise_if_error=raise_if_error, validate_scopes=validate_scopes, **kwargs))
-            for request in requests
-        ], return_when=return_when)
-        done = [x.result() for x in done]
-        return done if len(requests) > 1 else done[0]
+
+class BoundClient:
+    """
+    A lightweight handle on a (shared) client, sending all requests for a specific ESI instance.
+
+    This allows many characters to share a single connection pool, with each request carrying its own authorization.
+    Closing the handle does not close the client it is bound to.
+    """
+    bound_methods = ('send_esi_request', 'stream_esi_request', 'batch', 'get_all_pages', 'iter_pages', 'bulk')
+
+    def __init__(self, client, esi):
+        self.client = client
+        self.esi = esi
+
+    def __call__(self, *requests, **kwargs):
+        return self.client(*requests, esi=self.esi, **kwargs)
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name in self.bound_methods:
+            return partial(attr, esi=self.esi)
+        return attr
+
+    def __repr__(self):
+        return '<%s: %r on %r>' % (self.__class__.__name__, self.esi, self.client)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
@@ -1,7 +1,9 @@
 from argparse import *
 
+from os import makedirs
 from os.path import join, splitext
 
+from esi.cache import FileSystemCache
 from esi.spec import ESISpec, ESISpecWriter
 from esi.utils import PathType, SWAGGER_SPEC_URLS
 
@@ -35,12 +37,15 @@ def generate(prog=None):
 
     parser.add_argument('out', help="The directory to write the generated python code to",
                         type=PathType(exists=True, type='dir'))
-    parser.add_argument('--mode', '-m', default='multiple', choices=['single', 'multiple'],
-                        help="Generate a single file ('single') or multiple files ('multiple', default).")
+    parser.add_argument('--mode', '-m', default='multiple', choices=['single', 'multiple', 'tags'],
+                        help="Generate a single file ('single'), multiple files ('multiple', default) or multiple "
+                             "files with a package of functions per tag, imported on first use ('tags').")
     parser.add_argument('--include-meta', help="Include the meta-spec into this output", default=False,
                         action='store_true')
     parser.add_argument('--encoding', '-e', choices=['utf-8', 'ascii'], help="Output encoding", default='utf-8')
     parser.add_argument('--namespace', '-n', default='', help="The namespace prefix to use for module imports")
+    parser.add_argument('--cache-dir', '-c', metavar='directory',
+                        help="Keep the downloaded specs in this directory, and only download them again when changed")
 
     filesgroup = parser.add_argument_group("Output files", description="Override default file outputs")
     for key, value in DEFAULT_FILES.items():
@@ -58,6 +63,9 @@ def generate(prog=None):
     for key, value in DEFAULT_TEMPLATES.items():
         templategroup.add_argument('--%s-template' % key, default=value, help="Override the %s module template" % key,
                                    metavar='templatename')
+    templategroup.add_argument('--functions-package-template', default='functions_package.py.jinja',
+                               metavar='templatename',
+                               help="Override the template of the functions package in the 'tags' mode")
 
     args = parser.parse_args()
 
@@ -74,6 +82,8 @@ def generate(prog=None):
         for key in DEFAULT_TEMPLATES
     }
 
+    cache = FileSystemCache(args.cache_dir) if args.cache_dir else None
+
     data = None
     if args.file:
         try:
@@ -82,14 +92,14 @@ def generate(prog=None):
         except:
             parser.error("Unable to load the specified json file")
     elif args.url:
-        data = ESISpec.from_url(args.url)
+        data = ESISpec.from_url(args.url, cache=cache)
     elif args.meta:
-        data = ESISpec.meta_spec()
+        data = ESISpec.meta_spec(cache=cache)
     else:
-        data = ESISpec.from_spec(args.preset or '_latest')
+        data = ESISpec.from_spec(args.preset or '_latest', cache=cache)
 
     if args.include_meta:
-        meta = ESISpec.meta_spec()
+        meta = ESISpec.meta_spec(cache=cache)
         data += meta
 
     writer = ESISpecWriter(data)
@@ -103,7 +113,7 @@ def generate(prog=None):
         files = {
             templates[key]: open(join(args.out, fnames[key]), 'wb')
             for key in DEFAULT_TEMPLATES
-            if skip[key] is False and key != 'full'
+            if skip[key] is False and key != 'full' and not (args.mode == 'tags' and key == 'functions')
         }
     modules = {
         '%s_module' % key: splitext(fnames[key])[0]
@@ -112,3 +122,9 @@ def generate(prog=None):
     }
     writer.render_batch(files, encoding=args.encoding, template_dirs=args.template_dir, base_namespace=args.namespace,
                         **modules)
+    if args.mode == 'tags' and not skip['functions']:
+        package = join(args.out, modules['functions_module'])
+        makedirs(package, exist_ok=True)
+        writer.render_tags(package, encoding=args.encoding, template_name=templates['functions'],
+                           package_template_name=args.functions_package_template, template_dirs=args.template_dir,
+                           base_namespace=args.namespace, **modules)
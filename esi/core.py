@@ -1,7 +1,8 @@
+import hashlib
 from typing import List
 
 #from esi.sessions import BaseSession, BaseSyncSession, BaseAsyncSession, SyncSession, AsyncSession
-from esi.client import Client, AsyncClient
+from esi.client import Client, AsyncClient, HTTP2AsyncClient
 from esi.utils import USER_AGENT
 
 from urllib.parse import urlunparse
@@ -19,6 +20,33 @@ class ESIBaseMetaClass(type):
             self.__anon_session = self(auth_token=None, enabled_scopes=[])
         return self.__anon_session
 
+    @property
+    def shared_client(self):
+        """
+        The client (and thus connection pool) shared by all instances of this class.
+        """
+        # Look in the class itself, so subclasses don't end up sharing the client of their parent
+        client = self.__dict__.get('_shared_client')
+        if client is None:
+            esi = self(auth_token=None, enabled_scopes=[])
+            client = esi.get_session_class()(esi=esi, **esi.get_session_kwargs())
+            setattr(self, '_shared_client', client)
+        return client
+
+    @property
+    def shared_async_client(self):
+        """
+        The async client (and thus connection pool) shared by all instances of this class.
+
+        As the connections are bound to the event loop they were created in, only use this from a single event loop.
+        """
+        client = self.__dict__.get('_shared_async_client')
+        if client is None:
+            esi = self(auth_token=None, enabled_scopes=[])
+            client = esi.get_async_session_class()(esi=esi, **esi.get_async_session_kwargs())
+            setattr(self, '_shared_async_client', client)
+        return client
+
 
 class ESIBase(metaclass=ESIBaseMetaClass):
     version = None  # type: str
@@ -28,9 +56,18 @@ class ESIBase(metaclass=ESIBaseMetaClass):
 
     session_class = Client
     async_session_class = AsyncClient
+    async_http2_session_class = HTTP2AsyncClient
+
+    #: True to use HTTP/2 for async sessions. The synchronous client of httpx only speaks HTTP/1.1, so this does not
+    #: apply to (sync) sessions.
+    http2 = False
 
     user_agent = USER_AGENT
 
+    #: True to let all instances send their requests through the shared client of the class, rather than creating
+    #: their own client (and connection pool) when used as a context manager.
+    share_connections = False
+
     def __hash__(self):
         return hash((
             self.auth_token,
@@ -42,13 +79,55 @@ class ESIBase(metaclass=ESIBaseMetaClass):
             self.version,
         ))
 
-    def __init__(self, *, auth_token=None, enabled_scopes=None, user_agent=None):
+    def __init__(self, *, auth_token=None, enabled_scopes=None, user_agent=None, identity=None):
+        """
+        :param auth_token: The access token to authenticate with, or a callable (like a `TokenProvider`) returning it
+        :param enabled_scopes: The scopes the access token was granted
+        :param user_agent: The user agent to send
+        :param identity: A stable identifier (like the character ID) for whom the requests are made, used to keep the
+                         cached responses of different characters apart. Defaults to the identity of the
+                         `TokenProvider`, or a hash of a static access token. Without any, responses requiring scopes
+                         are not cached.
+        """
         self.auth_token = auth_token
         self.enabled_scopes = enabled_scopes
+        self.identity = identity
         self.active_session = None  # type: BaseSession
         if user_agent:
             self.user_agent = user_agent
 
+    def get_auth_token(self):
+        """
+        Get the current access token, or None for unauthenticated requests.
+
+        This is evaluated for every request, so a `TokenProvider` can refresh the token as it expires.
+        """
+        if callable(self.auth_token):
+            return self.auth_token()
+        return self.auth_token
+
+    async def get_auth_token_async(self):
+        """
+        Get the current access token without blocking the event loop, or None for unauthenticated requests.
+        """
+        if hasattr(self.auth_token, 'get_token_async'):
+            return await self.auth_token.get_token_async()
+        return self.get_auth_token()
+
+    def get_identity(self):
+        """
+        Get the identity the requests of this instance are made as, or None for unauthenticated requests.
+        """
+        if self.identity is not None:
+            return self.identity
+        if getattr(self.auth_token, 'identity', None) is not None:
+            return self.auth_token.identity
+        if not self.auth_token or callable(self.auth_token):
+            # A callable returns a different token over time, so it has no stable identity of its own
+            return None
+        # Never store the access token itself in (persistent) cache keys
+        return 'token-%s' % hashlib.sha256(self.auth_token.encode()).hexdigest()
+
     def __repr__(self):
         from urllib.parse import urlunparse
         return '<{name}: {auth} for {host} version {version}>'.format(
@@ -66,11 +145,37 @@ class ESIBase(metaclass=ESIBaseMetaClass):
         return klass
 
     def get_async_session_class(self):
-        klass = self.async_session_class
+        klass = self.async_http2_session_class if self.http2 else self.async_session_class
         if not issubclass(klass, AsyncClient):
             raise TypeError("async_session_class does not subclass AsyncClient")
         return klass
 
+    def get_session_kwargs(self):
+        """
+        The keyword arguments to create a session (client) with.
+        """
+        return {}
+
+    def get_async_session_kwargs(self):
+        """
+        The keyword arguments to create an async session (client) with.
+        """
+        return {}
+
+    @property
+    def client(self):
+        """
+        A handle to send requests for this instance through the shared client of the class.
+        """
+        return type(self).shared_client.bind(self)
+
+    @property
+    def async_client(self):
+        """
+        A handle to send requests for this instance through the shared async client of the class.
+        """
+        return type(self).shared_async_client.bind(self)
+
     def get_scheme(self):
         return (self.schemes + ['https'])[0]
 
@@ -81,19 +186,29 @@ class ESIBase(metaclass=ESIBaseMetaClass):
     @classmethod
     def session(cls, *, auth_token, enabled_scopes=None):
         obj = cls(auth_token=auth_token, enabled_scopes=enabled_scopes)
-        return obj.get_session_class()(esi=obj)
+        if cls.share_connections:
+            return obj.client
+        return obj.get_session_class()(esi=obj, **obj.get_session_kwargs())
 
     @classmethod
     async def async_session(cls, *, auth_token, enabled_scopes=None):
         obj = cls(auth_token=auth_token, enabled_scopes=enabled_scopes)
-        return obj.get_async_session_class()(esi=obj)
+        if cls.share_connections:
+            return obj.async_client
+        return obj.get_async_session_class()(esi=obj, **obj.get_async_session_kwargs())
 
     def __enter__(self):
-        self.active_session = self.get_session_class()(esi=self)
+        if self.share_connections:
+            self.active_session = self.client
+        else:
+            self.active_session = self.get_session_class()(esi=self, **self.get_session_kwargs())
         return self.active_session.__enter__()
 
     def __aenter__(self):
-        self.active_session = self.get_async_session_class()(esi=self)
+        if self.share_connections:
+            self.active_session = self.async_client
+        else:
+            self.active_session = self.get_async_session_class()(esi=self, **self.get_async_session_kwargs())
         return self.active_session.__aenter__()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
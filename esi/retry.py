@@ -0,0 +1,114 @@
+import random
+import time
+from threading import Lock
+
+from httpx import NetworkError, ProtocolError, TimeoutException
+
+from esi.cache import parse_http_date
+from esi.utils import try_int
+
+RETRYABLE_EXCEPTIONS = (NetworkError, ProtocolError, TimeoutException)
+
+
+class RetryBudget:
+    """
+    Limits the total amount of retries made for a batch of requests, so a failing upstream does not cause a batch
+    to multiply its load.
+    """
+    def __init__(self, retries):
+        self.remaining = retries
+        self._lock = Lock()
+
+    def consume(self) -> bool:
+        """
+        Take a single retry from the budget.
+
+        :return: True if there was budget left for the retry
+        """
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+class RetryPolicy:
+    """
+    Determines if and when a failed request is retried.
+
+    Delays grow exponentially with (full) jitter, so retries of many requests failing at the same time are spread out
+    rather than hitting ESI at the same moment. A `Retry-After` header, or the `X-Esi-Error-Limit-Reset` header of an
+    error limited (420) response, takes precedence over the exponential delay.
+    """
+    retry_statuses = (420, 500, 502, 503, 504)
+    idempotent_methods = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=60, jitter=True, statuses=None, methods=None,
+                 budget_ratio=0.1, min_budget=3):
+        """
+        :param max_retries: The maximum amount of retries per request
+        :param backoff_factor: The base delay (in seconds), doubled with each attempt
+        :param max_backoff: The maximum delay (in seconds) between attempts
+        :param jitter: True to randomize the delay between 0 and the exponential delay
+        :param statuses: The status codes to retry, defaults to `retry_statuses`
+        :param methods: The methods to retry, defaults to the idempotent methods
+        :param budget_ratio: The total amount of retries allowed for a batch, relative to its amount of requests
+        :param min_budget: The minimum amount of retries allowed for a batch
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = tuple(statuses or self.retry_statuses)
+        self.methods = tuple(x.upper() for x in (methods or self.idempotent_methods))
+        self.budget_ratio = budget_ratio
+        self.min_budget = min_budget
+
+    def new_budget(self, size) -> RetryBudget:
+        """
+        Create the retry budget for a batch of `size` requests.
+        """
+        return RetryBudget(max(self.min_budget, int(size * self.budget_ratio)))
+
+    def should_retry(self, request, attempt, response=None) -> bool:
+        """
+        :param request: The request that failed
+        :param attempt: The amount of retries made so far
+        :param response: The response, or None if the request failed without one
+        """
+        if attempt >= self.max_retries or request.method not in self.methods:
+            return False
+        return response is None or response.status_code in self.statuses
+
+    def get_delay(self, attempt, response=None, now=None) -> float:
+        """
+        Get the amount of seconds to wait before the next attempt.
+        """
+        if response is not None:
+            delay = self.get_server_delay(response, now)
+            if delay is not None:
+                return min(delay, self.max_backoff)
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def get_server_delay(self, response, now=None):
+        """
+        Get the delay the server asked for, if any.
+        """
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            seconds = try_int(retry_after)
+            if seconds is None:
+                date = parse_http_date(retry_after)
+                if date is not None:
+                    seconds = date - (time.time() if now is None else now)
+            if seconds is not None:
+                return max(seconds, 0)
+        if response.status_code == 420:
+            reset = try_int(response.headers.get('X-Esi-Error-Limit-Reset'))
+            if reset is not None:
+                # Add some jitter, so not everyone returns at the very moment the window resets
+                return reset + (random.uniform(0, 1) if self.jitter else 0)
+        return None
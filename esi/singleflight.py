@@ -0,0 +1,82 @@
+from asyncio import create_task, shield
+from threading import Event, Lock
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = Event()
+        self.result = None
+        self.error = None  # type: BaseException
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls made from multiple threads at the same time, so only one of them does the actual work
+    and all of them receive its result.
+    """
+    def __init__(self):
+        self._lock = Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        """
+        Call `func`, unless a call with the same key is already in flight, in which case we wait for its result.
+
+        :param key: The key identifying identical calls
+        :param func: The function to call, without any arguments
+        :return: The result of the (shared) call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def __len__(self):
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces identical coroutines awaited at the same time, so only one of them does the actual work and all of them
+    receive its result.
+
+    The shared work runs in its own task, so cancelling one of the waiters does not cancel it for the others.
+    """
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, func):
+        """
+        Await `func()`, unless a call with the same key is already in flight, in which case we wait for its result.
+
+        :param key: The key identifying identical calls
+        :param func: The coroutine function to call, without any arguments
+        :return: The result of the (shared) call
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = create_task(func())
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await shield(task)
+
+    def __len__(self):
+        return len(self._calls)
@@ -0,0 +1,166 @@
+import math
+from array import array
+from collections.abc import Mapping
+from typing import Dict, List
+
+from esi.exceptions import MissingPackageError
+from esi.spec.dates import parse_epoch
+from esi.spec.describeable import Describeable
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# The typecode of `array.array` and the NumPy dtype used for each kind of column
+COLUMN_TYPES = {
+    'integer': ('q', 'int64'),
+    'number': ('d', 'float64'),
+    'boolean': ('B', 'bool'),
+    'date-time': ('q', 'int64'),
+    'date': ('q', 'int64'),
+}
+
+
+def resolve(described: Describeable) -> Describeable:
+    while described is not None and described._type == 'schema':
+        described = described.schema
+    return described
+
+
+def get_column_kind(described: Describeable):
+    """
+    Get the kind of column for a property, or None if the property is not a scalar.
+    """
+    described = resolve(described)
+    if described._type in ('integer', 'number', 'boolean'):
+        return described._type
+    if described._type == 'string':
+        return described.format if described.format in ('date', 'date-time') else 'string'
+    return None
+
+
+def get_flat_properties(described: Describeable):
+    """
+    Get the properties of the items of an array of flat objects (objects with only scalar properties).
+
+    :return: A dict of property names to their description, or None if the items are not flat objects
+    """
+    described = resolve(described)
+    if described is None or described._type != 'array':
+        return None
+    items = resolve(described.items)
+    if items is None or items._type != 'object' or not items.properties:
+        return None
+    if any(get_column_kind(prop) is None for prop in items.properties.values()):
+        return None
+    return items.properties
+
+
+def use_numpy(enabled=None) -> bool:
+    if enabled and numpy is None:
+        raise MissingPackageError("NumPy is not available, but is required for NumPy columns. "
+                                  "Install it with `pip install numpy`.")
+    return numpy is not None if enabled is None else enabled
+
+
+def build_column(prop: Describeable, values: list, with_numpy=False):
+    """
+    Build a single column from the raw values of a property.
+
+    Numeric columns are packed into an `array.array` (or a NumPy array), date-times are stored as epoch seconds.
+    Missing numbers are stored as NaN; integer, boolean and date columns with missing values fall back to a list.
+    """
+    kind = get_column_kind(prop)
+    if kind == 'string':
+        column = [None if x is None else prop.to_python(x) for x in values]
+        return numpy.array(column, dtype=object) if with_numpy else column
+    if kind in ('date', 'date-time'):
+        values = [None if x is None else parse_epoch(x) for x in values]
+    elif kind == 'number':
+        values = [math.nan if x is None else x for x in values]
+    typecode, dtype = COLUMN_TYPES[kind]
+    if None in values:
+        return numpy.array(values, dtype=object) if with_numpy else values
+    if with_numpy:
+        return numpy.array(values, dtype=dtype)
+    return array(typecode, values)
+
+
+def to_columns(described: Describeable, value: list, with_numpy=None) -> 'Columns':
+    """
+    Convert an array of flat objects into columns, without creating an object per row.
+
+    :param described: The description of the array
+    :param value: The decoded JSON array
+    :param with_numpy: True to build NumPy arrays, False for `array.array`, or None to use NumPy if it is installed
+    :return: The columns, by property name
+    :raises TypeError: If the items are not flat objects
+    """
+    props = get_flat_properties(described)
+    if props is None:
+        raise TypeError("Only arrays of flat objects can be converted to columns")
+    with_numpy = use_numpy(with_numpy)
+    columns = {
+        name: build_column(prop, [row.get(name, prop.default) for row in value], with_numpy)
+        for name, prop in props.items()
+    }
+    return Columns(columns, len(value))
+
+
+class Columns(Mapping):
+    """
+    An array of flat objects in columnar form, mapping the name of each property to its column.
+    """
+    def __init__(self, columns: Dict[str, List], num_rows: int):
+        self.columns = columns
+        self.num_rows = num_rows
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __iter__(self):
+        return iter(self.columns)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def copy(self) -> 'Columns':
+        return Columns({name: column.copy() if hasattr(column, 'copy') else column[:]
+                        for name, column in self.columns.items()}, self.num_rows)
+
+    def extend(self, other: 'Columns'):
+        """
+        Append the rows of other columns (like those of the next page) to these.
+        """
+        for name, column in self.columns.items():
+            more = other.columns[name]
+            if numpy is not None and isinstance(column, numpy.ndarray):
+                self.columns[name] = numpy.concatenate([column, more])
+            elif isinstance(column, array) and not isinstance(more, array):
+                # The other page has missing values, fall back to a list
+                self.columns[name] = column.tolist() + list(more)
+            else:
+                column.extend(more)
+        self.num_rows += other.num_rows
+
+    def rows(self):
+        """
+        Iterate over the rows as dicts, for the occasional consumer that needs them.
+        """
+        names = list(self.columns)
+        for row in zip(*self.columns.values()):
+            yield dict(zip(names, row))
+
+    def to_records(self):
+        """
+        Get the columns as a NumPy structured array.
+        """
+        use_numpy(True)
+        return numpy.rec.fromarrays(
+            [numpy.asarray(column) for column in self.columns.values()],
+            names=list(self.columns),
+        )
+
+    def __repr__(self):
+        return '<%s: %d rows of %s>' % (self.__class__.__name__, self.num_rows, ', '.join(self.columns))
@@ -0,0 +1,37 @@
+import re
+from calendar import timegm
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import iso8601
+
+# The shape ESI uses for all its date-times, like 2020-01-01T12:00:00Z
+ESI_DATETIME = re.compile(r'^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})Z$')
+# Responses repeat the same few timestamps over and over, so remember the most recent ones
+CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_datetime(value: str) -> datetime:
+    """
+    Parse an ISO-8601 date(-time), taking a fast path for the shape ESI uses and falling back to `iso8601` for
+    anything else.
+
+    :raises iso8601.ParseError: If the value is not a valid ISO-8601 date(-time)
+    """
+    match = ESI_DATETIME.match(value)
+    if match is not None:
+        try:
+            return datetime(*map(int, match.groups()), tzinfo=timezone.utc)
+        except ValueError:
+            # Out of range, let iso8601 produce the error
+            pass
+    return iso8601.parse_date(value)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_epoch(value: str) -> int:
+    """
+    Parse an ISO-8601 date(-time) into the amount of seconds since the epoch.
+    """
+    return timegm(parse_datetime(value).utctimetuple())
@@ -1,6 +1,6 @@
 from typing import Any, Dict
 
-from esi.utils import cached_property, to_camel_case
+from esi.utils import cached_slot_property, to_camel_case
 
 
 class PropDict(dict):
@@ -33,28 +33,85 @@ class PropDict(dict):
         return super().__repr__()
 
 
+class ExtraField:
+    """
+    A rarely set property of a `Describeable`, stored in its `_extra` dict rather than in a slot of its own.
+    """
+    def __init__(self, default=None):
+        self.default = default
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        extra = instance._extra
+        if extra is None:
+            return self.default
+        return extra.get(self.name, self.default)
+
+    def __set__(self, instance, value):
+        extra = instance._extra
+        if value == self.default:
+            if extra is not None:
+                extra.pop(self.name, None)
+            return
+        if extra is None:
+            extra = instance._extra = {}
+        extra[self.name] = value
+
+
 class Describeable:
     """
     All properties when passed are prefixed with a _ as some might be identical to python keywords, or shadow
     python types/functions.
+
+    A full spec holds tens of thousands of these, so they use __slots__ rather than a __dict__. Only the commonly set
+    properties get a slot, the others are `ExtraField`s sharing their default until they are set.
     """
-    _title = None  # type: str
-    _type = None  # type: str
-    _format = None  # type: str
-    _description = None  # type: str
-    _is_global = False  # type: bool
-    _required = False  # type: bool
-    _properties = None
-    _items = None
-    _required = False  # type: bool
-    _schema = None
-    _default = None  # type: Any
-
-    _min_items = None  # type: int
-    _max_items = None  # type: int
-    _unique_items = False  # type: bool
-    _minimum = None  # type: int
-    _maximum = None  # type: int
+    _defaults = {
+        '_title': None,
+        '_type': None,
+        '_format': None,
+        '_description': None,
+        '_is_global': False,
+        '_required': False,
+        '_properties': None,
+        '_items': None,
+        '_schema': None,
+        '_default': None,
+
+        '_min_items': None,
+        '_max_items': None,
+        '_unique_items': False,
+        '_minimum': None,
+        '_maximum': None,
+    }  # type: Dict[str, Any]
+
+    __slots__ = (
+        '_type',
+        '_format',
+        '_description',
+        '_required',
+        '_properties',
+        '_items',
+        '_extra',
+        '_cache',
+    )
+    # The fields that have a slot of their own, in the order they are pickled in
+    _slot_fields = __slots__[:-2]
+
+    _title = ExtraField()
+    _schema = ExtraField()
+    _default = ExtraField()
+    _is_global = ExtraField(False)
+    _min_items = ExtraField()
+    _max_items = ExtraField()
+    _unique_items = ExtraField(False)
+    _minimum = ExtraField()
+    _maximum = ExtraField()
 
     _skippable_keys = [
         'title',
@@ -70,9 +127,10 @@ class Describeable:
 
     def __init__(self, **kwargs):
         from esi.spec.schema import Schema
-        for k, v in kwargs.items():
-            if hasattr(self, k):
-                setattr(self, k, v)
+        self._extra = None
+        self._cache = None
+        for k, v in self._defaults.items():
+            setattr(self, k, kwargs.get(k, v))
 
         if self._items and not isinstance(self._items, Describeable):
             # noinspection PyTypeChecker
@@ -87,7 +145,7 @@ class Describeable:
                 if not isinstance(self._schema, Describeable) else self._schema
             self._type = "schema"
 
-    @cached_property
+    @cached_slot_property
     def internal_type(self):
         from esi.spec.types import TYPELIST, DEFAULT_TYPE
         return TYPELIST.get(self._type, DEFAULT_TYPE)  # type: Type
@@ -96,7 +154,7 @@ class Describeable:
     def python_type(self):
         return self.internal_type.python_type
 
-    @cached_property
+    @cached_slot_property
     def typing_type(self) -> str:
         return self.internal_type.get_typing_type(self)
 
@@ -107,19 +165,85 @@ class Describeable:
             return None
         return getattr(tt, '__name__', str(tt))
 
+    @cached_slot_property
+    def compiled_validator(self):
+        """
+        The validation of `validate`, compiled into a single function for this object and everything below it.
+        """
+        return self.internal_type.compile_validator(self)
+
+    @cached_slot_property
+    def compiled_shallow_validator(self):
+        """
+        Like `compiled_validator`, but without validating the items of arrays and properties of objects.
+        """
+        return self.internal_type.compile_validator(self, shallow=True)
+
     def validate(self, value):
-        return self.internal_type.validate(self, value)
+        return self.compiled_validator(value)
+
+    @cached_slot_property
+    def compiled_to_python(self):
+        """
+        The conversion of `to_python`, compiled into a single function for this object and everything below it.
+        """
+        return self.internal_type.compile_to_python(self)
+
+    @cached_slot_property
+    def compiled_to_python_epoch(self):
+        """
+        Like `compiled_to_python`, but converting dates and date-times to seconds since the epoch.
+        """
+        return self.internal_type.compile_to_python(self, epoch=True)
+
+    def get_to_python(self, epoch=False):
+        return self.compiled_to_python_epoch if epoch else self.compiled_to_python
+
+    @cached_slot_property
+    def compiled_from_python(self):
+        """
+        The conversion of `from_python`, compiled into a single function for this object and everything below it.
+        """
+        return self.internal_type.compile_from_python(self)
+
+    def __getstate__(self):
+        # The compiled conversions and validators can not be pickled, they are compiled again when needed. Keep the
+        # state compact, as a cached spec unpickles tens of thousands of these.
+        return tuple(getattr(self, key) for key in self._slot_fields), self._extra
+
+    def __setstate__(self, state):
+        values, self._extra = state
+        self._cache = None
+        for key, value in zip(self._slot_fields, values):
+            setattr(self, key, value)
 
     def from_python(self, value):
-        return self.internal_type.from_python(self, value)
+        return self.compiled_from_python(value)
 
-    def to_python(self, value):
-        return self.internal_type.to_python(self, value)
+    def to_python(self, value, epoch=False):
+        """
+        :param value: The value to convert
+        :param epoch: True to convert dates and date-times to seconds since the epoch, rather than datetimes
+        """
+        return self.get_to_python(epoch)(value)
+
+    def to_columns(self, value, with_numpy=None):
+        """
+        Convert an array of flat objects into columns, see `esi.spec.columnar`.
+        """
+        from esi.spec.columnar import to_columns
+        return to_columns(self, value, with_numpy)
+
+    def to_lazy(self, value, epoch=False):
+        """
+        Like `to_python`, but objects and arrays are converted on access, see `esi.spec.lazy`.
+        """
+        from esi.spec.lazy import to_lazy
+        return to_lazy(self, value, epoch)
 
     @property
     def data(self):
-        items = sorted([x for x in dir(self) if x.startswith('_') and not x.startswith('__') and hasattr(self, x)])
-        items = [x for x in items if getattr(self, x) != getattr(self.__class__, x)]
+        items = [x for x in sorted(self._defaults) if getattr(self, x) != self._defaults[x]]
         return {
             key: getattr(self, key)
             for key in items + ['python_type', 'typing_type', 'typing_type_name']
@@ -222,8 +346,8 @@ class Describeable:
 
 
 class Property(Describeable):
-    pass
+    __slots__ = ()
 
 
 class Item(Describeable):
-    pass
+    __slots__ = ()
@@ -8,6 +8,11 @@ from esi.exceptions import ValidationError
 from esi.spec.schema import Schema
 from esi.spec.parameter import Parameter
 
+VALIDATION_OFF = 'off'
+VALIDATION_SHALLOW = 'shallow'
+VALIDATION_FULL = 'full'
+VALIDATION_LEVELS = (VALIDATION_OFF, VALIDATION_SHALLOW, VALIDATION_FULL)
+
 
 class Function(Request):
     path = None  # type: str
@@ -17,6 +22,10 @@ class Function(Request):
     scopes = []  # type: List[str]
     params = []  # type: List[Parameter]
     responses = {}  # type: Dict[int, Schema]
+    identity = None  # The identity the request is made as, set when it is prepared by a client
+    authenticated = False
+    prepared = False  # Set once a client has prepared the request for sending
+    validation = VALIDATION_FULL  # The validation level for the arguments, one of VALIDATION_LEVELS
 
     def __init__(self, **kwargs):
         data = {
@@ -27,16 +36,20 @@ class Function(Request):
         }
         data['header'] = data['headers']
         skip_validation = kwargs.pop('esi_skip_validation', False)
+        validation = kwargs.pop('esi_validation', None) or self.validation
         errors = {}
-        for param in self.params:
-            value = kwargs.pop(param.safe_name)
-            if value == param.default:
+        self.arguments = {}
+        for safe_name, name, part, default, validate in self.get_compiled_params(validation):
+            value = kwargs.pop(safe_name)
+            self.arguments[safe_name] = value
+            if value == default:
                 continue
-            try:
-                param.validate(value)
-            except ValidationError as e:
-                e.update_error_dict(errors, param.safe_name)
-            data[param.part][param.name] = value
+            if validate is not None:
+                try:
+                    validate(value)
+                except ValidationError as e:
+                    e.update_error_dict(errors, safe_name)
+            data[part][name] = value
         if errors and not skip_validation:
             raise ValidationError(errors)
 
@@ -48,7 +61,8 @@ class Function(Request):
         self.method = cls.method.upper()
         self.url = URL(self.path.format(**data['path']), allow_relative=True, params=data['query'])
         self.headers = Headers(data['header'])
-        self.stream = encode(body, None, None)
+        # ESI bodies are always JSON
+        self.stream = encode(json=body)
         self.timer = ElapsedTimer()
         self.prepare()
         # Clear out headers we don't need (These will be set by the session)
@@ -56,6 +70,111 @@ class Function(Request):
             if key in self.headers:
                 del self.headers[key]
 
+    @classmethod
+    def get_compiled_params(cls, validation=VALIDATION_FULL):
+        """
+        Get the parameters of this function, compiled for the validation level on first use.
+
+        :param validation: One of `VALIDATION_LEVELS`
+        :return: A list of tuples of the safe name, name, part, default and validator (if any) of each parameter
+        """
+        compiled = cls.__dict__.get('_compiled_params')
+        if compiled is None:
+            compiled = {}
+            # Stored on the class itself, as subclasses may have different parameters
+            setattr(cls, '_compiled_params', compiled)
+        params = compiled.get(validation)
+        if params is None:
+            if validation not in VALIDATION_LEVELS:
+                raise ValueError("Unknown validation level: %s" % validation)
+            params = compiled[validation] = [
+                (param.safe_name, param.name, param.part, param.default, {
+                    VALIDATION_OFF: None,
+                    VALIDATION_SHALLOW: param.compiled_shallow_validator,
+                    VALIDATION_FULL: param.compiled_validator,
+                }[validation])
+                for param in cls.params
+            ]
+        return params
+
+    def copy_with(self, esi_validation=None, **kwargs):
+        """
+        Create a new request for the same function, replacing the specified arguments.
+
+        :param esi_validation: The validation level for the arguments, defaults to `validation`
+        """
+        arguments = dict(self.arguments)
+        arguments.update(kwargs)
+        if esi_validation is None:
+            return self.__class__(**arguments)
+        return self.build(validation=esi_validation, **arguments)
+
+    @classmethod
+    def build(cls, validation=None, **kwargs):
+        """
+        Create a request for this function, validating the arguments at the specified level.
+
+        Generated functions only take their own parameters, use this to choose the validation level for a single call,
+        like `get_markets_region_id_orders.build(validation=VALIDATION_OFF, region_id=10000002)`.
+
+        :param validation: One of `VALIDATION_LEVELS`, defaults to `validation`
+        :raises TypeError: If a required argument is missing, or an argument is unknown
+        """
+        arguments = {}
+        for param in cls.params:
+            if param.safe_name in kwargs:
+                arguments[param.safe_name] = kwargs.pop(param.safe_name)
+            elif param.required:
+                raise TypeError("%s.build() missing required argument: %r" % (cls.__name__, param.safe_name))
+            else:
+                arguments[param.safe_name] = param.default
+        if kwargs:
+            raise TypeError("%s.build() got unexpected arguments: %s" % (cls.__name__, ', '.join(sorted(kwargs))))
+        # Skip the __init__ of generated functions to pass the validation level
+        request = cls.__new__(cls)
+        Function.__init__(request, esi_validation=validation, **arguments)
+        return request
+
+    @classmethod
+    def has_param(cls, name):
+        return any(param.name == name for param in cls.params)
+
+    @classmethod
+    def get_bulk_param(cls):
+        """
+        Get the body parameter of this function that takes an array, along with the description of that array.
+
+        :return: A tuple of the parameter and the array description, or (None, None) if there is no such parameter
+        """
+        for param in cls.params:
+            if param.part != 'body':
+                continue
+            described = param.schema if param._type == 'schema' else param
+            if described is not None and described._type == 'array':
+                return param, described
+        return None, None
+
+    @classmethod
+    def bulk_requests(cls, values, **kwargs):
+        """
+        Create the requests needed to send an arbitrary amount of values to a function taking an array body.
+
+        The values are deduplicated (keeping their order) and split into chunks of at most the allowed amount of items.
+
+        :param values: The values to send
+        :param kwargs: The other arguments for the function
+        :return: A list of requests
+        """
+        param, described = cls.get_bulk_param()
+        if param is None:
+            raise TypeError("%s does not take an array body" % cls.__name__)
+        values = list(dict.fromkeys(values))
+        size = described.max_items or len(values) or 1
+        return [
+            cls(**{param.safe_name: values[x:x + size]}, **kwargs)
+            for x in range(0, len(values), size)
+        ]
+
     @classmethod
     def decorate(cls, func):
         func.handler = cls
@@ -0,0 +1,145 @@
+from collections.abc import Mapping, Sequence
+
+from esi.spec.describeable import Describeable
+
+
+class _Missing:
+    """
+    Marks an item that was not converted yet. Pickles as the module level instance, so lazy views still work when
+    they are loaded from a persistent cache.
+    """
+    def __reduce__(self):
+        return '_MISSING'
+
+    def __repr__(self):
+        return '<missing>'
+
+
+_MISSING = _Missing()
+
+
+def to_lazy(described: Describeable, value, epoch=False):
+    """
+    Wrap the value in a lazy view if it is an object or array, or convert it right away otherwise.
+
+    :param described: The described object
+    :param value: The value to convert
+    :param epoch: True to convert dates and date-times to seconds since the epoch, rather than datetimes
+    :return: The (lazily) converted value
+    """
+    from esi.spec.types import ArrayType, ObjectType, SchemaType
+    internal_type = described.internal_type
+    if isinstance(internal_type, SchemaType):
+        return to_lazy(described.schema, value, epoch)
+    if isinstance(internal_type, ObjectType) and isinstance(value, dict):
+        return LazyObject(described, value, epoch)
+    if isinstance(internal_type, ArrayType) and isinstance(value, list):
+        return LazySequence(described.items, value, epoch)
+    return described.to_python(value, epoch) if epoch else described.to_python(value)
+
+
+def materialize(value):
+    """
+    Convert a (lazy) value entirely, returning plain dicts and lists.
+    """
+    if isinstance(value, (LazyObject, LazySequence)):
+        return value.materialize()
+    return value
+
+
+class LazyObject(Mapping):
+    """
+    A read-only view on an object in a response, converting each property through its `Describeable` only when it is
+    first accessed.
+
+    Contains the same keys and values as `ObjectType.to_python` would have returned, use `materialize` to get that.
+    """
+    __slots__ = ('_described', '_raw', '_values', '_epoch')
+
+    def __init__(self, described: Describeable, raw: dict, epoch=False):
+        """
+        :param described: The described object
+        :param raw: The decoded JSON object
+        :param epoch: True to convert dates and date-times to seconds since the epoch
+        """
+        self._described = described
+        self._raw = raw
+        self._values = {}
+        self._epoch = epoch
+
+    @property
+    def _properties(self):
+        return self._described.properties or {}
+
+    def __getitem__(self, key):
+        value = self._values.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        prop = self._properties.get(key)
+        if prop is None or (key not in self._raw and not prop.default):
+            raise KeyError(key)
+        value = self._values[key] = to_lazy(prop, self._raw.get(key, prop.default), self._epoch)
+        return value
+
+    def __iter__(self):
+        for name, prop in self._properties.items():
+            if name in self._raw or prop.default:
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        prop = self._properties.get(key)
+        return prop is not None and (key in self._raw or bool(prop.default))
+
+    def materialize(self) -> dict:
+        return {key: materialize(value) for key, value in self.items()}
+
+    def __repr__(self):
+        return '<%s: %r>' % (self.__class__.__name__, self._raw)
+
+
+class LazySequence(Sequence):
+    """
+    A read-only view on an array in a response, converting each item through its `Describeable` only when it is
+    first accessed.
+
+    Contains the same items as `ArrayType.to_python` would have returned, use `materialize` to get that.
+    """
+    __slots__ = ('_described', '_raw', '_values', '_epoch')
+
+    def __init__(self, described: Describeable, raw: list, epoch=False):
+        """
+        :param described: The described items
+        :param raw: The decoded JSON array
+        :param epoch: True to convert dates and date-times to seconds since the epoch
+        """
+        self._described = described
+        self._raw = raw
+        self._values = [_MISSING] * len(raw)
+        self._epoch = epoch
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[x] for x in range(*index.indices(len(self._raw)))]
+        value = self._values[index]
+        if value is _MISSING:
+            value = self._values[index] = to_lazy(self._described, self._raw[index], self._epoch)
+        return value
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def materialize(self) -> list:
+        return [materialize(value) for value in self]
+
+    def __repr__(self):
+        return '<%s: %r>' % (self.__class__.__name__, self._raw)
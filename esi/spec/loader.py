@@ -1,15 +1,15 @@
 import json
 from distutils.version import StrictVersion
-from urllib.parse import urlunparse
+from urllib.parse import urlencode, urlunparse
 
-import jsonref
 import httpx
 
+from esi.cache import CacheEntry, get_expiry
 from esi.exceptions import InvalidSpecError
-from esi.spec.parameter import Parameter
 from esi.spec.path import Path
-from esi.spec.schema import Schema
+from esi.spec.resolver import RefResolver
 from esi.utils import USER_AGENT, SWAGGER_SPEC_URLS, SWAGGER_BASE_URL, SWAGGER_META_URL
+from esi.version import __version__
 
 
 class ESISpec:
@@ -20,10 +20,11 @@ class ESISpec:
         self.paths_per_method = {}
 
         self._data = data
-        # Load our global stuff before we go through the references
-        self.load_globals()
-        # Convert it to allow references
-        self._data = jsonref.JsonRef.replace_refs(self._data, base_uri="")
+        resolver = RefResolver(self._data)
+        # Load our global stuff before we go through the references, so they all share the same objects
+        self.load_globals(resolver)
+        # Replace the remaining references with what they point to
+        self._data = resolver.resolve(self._data)
         # Build our path list
         self.load_paths()
 
@@ -54,16 +55,13 @@ class ESISpec:
         self.combine_functions(other)
         return self
 
-    def load_globals(self):
-        defs = self._data.get('definitions', {})
-        for key in list(defs.keys()):
-            obj = Schema.from_json(defs[key], is_global=True)
-            defs[key] = self.global_definitions[key] = obj
+    def load_globals(self, resolver=None):
+        resolver = resolver or RefResolver(self._data)
+        for key in list(self._data.get('definitions', {}).keys()):
+            self.global_definitions[key] = resolver.get_global('definitions', key)
 
-        params = self._data.get('parameters', {})
-        for key in list(params.keys()):
-            obj = Parameter.from_json(params[key], is_global=True)
-            params[key] = self.global_parameters[key] = obj
+        for key in list(self._data.get('parameters', {}).keys()):
+            self.global_parameters[key] = resolver.get_global('parameters', key)
 
     def load_paths(self):
         for url, methods in self._data.get('paths', {}).items():
@@ -111,21 +109,54 @@ class ESISpec:
             yield urlunparse((scheme, host, path, '', '', ''))
 
     @classmethod
-    def from_spec(cls, spec, params=None):
+    def from_spec(cls, spec, params=None, **kwargs):
         if spec not in SWAGGER_SPEC_URLS:
             raise InvalidSpecError(spec)
-        return cls.from_url(SWAGGER_BASE_URL.format(spec=spec), params=params)
+        return cls.from_url(SWAGGER_BASE_URL.format(spec=spec), params=params, **kwargs)
 
     @classmethod
-    def meta_spec(cls, params=None):
-        return cls.from_url(SWAGGER_META_URL, params=params)
+    def meta_spec(cls, params=None, **kwargs):
+        return cls.from_url(SWAGGER_META_URL, params=params, **kwargs)
 
     @classmethod
-    def from_url(cls, url, params=None):
-        resp = httpx.get(url, params=params, headers={
+    def get_cache_key(cls, url, params=None):
+        # Include our version, as a spec pickled by another version may not load properly
+        return 'esi-py-spec:%s:%s?%s' % (__version__, url, urlencode(sorted(dict(params or {}).items())))
+
+    @classmethod
+    def from_url(cls, url, params=None, cache=None, client=None):
+        """
+        :param url: The URL of the swagger spec
+        :param params: The query parameters to add to the URL
+        :param cache: A cache from `esi.cache` to keep the loaded spec in. A cached spec is revalidated with its ETag,
+                      and is not parsed and loaded again when it has not changed.
+        :param client: The `httpx.Client` to download the spec with
+        :return: The loaded spec
+        """
+        key = cls.get_cache_key(url, params)
+        entry = cache.get(key) if cache is not None else None
+        if entry is not None and cache.honors_expires and entry.is_fresh():
+            return entry.data
+
+        headers = {
             'User-Agent': USER_AGENT,
-        })
-        return cls(resp.json())
+        }
+        if entry is not None and entry.etag:
+            headers['If-None-Match'] = entry.etag
+        resp = (client or httpx).get(url, params=params, headers=headers)
+        if entry is not None and resp.status_code == 304:
+            expires = get_expiry(resp.headers)
+            if expires is not None:
+                # Fresh again, the next load does not need to revalidate it
+                entry.expires = expires
+                cache.set(key, entry)
+            return entry.data
+
+        spec = cls(resp.json())
+        if cache is not None and resp.status_code == 200:
+            cache.set(key, CacheEntry(resp.headers.get('ETag'), resp.status_code, spec, resp.headers,
+                                      expires=get_expiry(resp.headers)))
+        return spec
 
     @classmethod
     def from_file(cls, fname, encoding=None):
@@ -1,17 +1,22 @@
 from functools import total_ordering
 
 from esi.utils import to_camel_case
-from esi.spec.describeable import Describeable
+from esi.spec.describeable import Describeable, ExtraField
 
 
 class BaseParameter(Describeable):
-    _enum = None
-    _in = None
-    _name = None
+    _defaults = dict(Describeable._defaults, _enum=None, _in=None, _name=None)
+
+    __slots__ = ('_in', '_name')
+    _slot_fields = Describeable._slot_fields + __slots__
+
+    _enum = ExtraField()
 
 
 @total_ordering
 class Parameter(BaseParameter):
+    __slots__ = ()
+
     @property
     def name(self):
         return self._name
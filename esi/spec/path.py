@@ -1,12 +1,15 @@
-from esi.utils import to_pascal_case, cached_property
+from esi.utils import to_pascal_case, cached_slot_property
 from esi.spec.schema import Schema
 from esi.spec.parameter import Parameter
 
 
 class Path:
+    __slots__ = ('url', 'method', '_data', '_parameters', '_responses', '_cache')
+
     def __init__(self, url, method, data):
         self._parameters = []
         self._responses = {}
+        self._cache = None
 
         self.url = url
         self.method = method
@@ -33,7 +36,7 @@ class Path:
     def indent_size(self):
         return len(self.operation_id)
 
-    @cached_property
+    @cached_slot_property
     def function_name(self):
         return to_pascal_case(self.operation_id, allow_double_under=True)
 
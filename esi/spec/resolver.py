@@ -0,0 +1,94 @@
+from esi.exceptions import InvalidSpecError
+from esi.spec.describeable import Describeable
+from esi.spec.parameter import Parameter
+from esi.spec.schema import Schema
+
+# The sections of a spec holding global objects, and the class each of them is loaded as
+GLOBAL_SECTIONS = {
+    'definitions': Schema,
+    'parameters': Parameter,
+}
+
+
+def escape(part: str) -> str:
+    return part.replace('~', '~0').replace('/', '~1')
+
+
+def unescape(part: str) -> str:
+    return part.replace('~1', '/').replace('~0', '~')
+
+
+class RefResolver:
+    """
+    Resolves the local `$ref`s of a spec, replacing them with what they point to.
+
+    Every reference is resolved once: references to the global definitions and parameters all share the same `Schema`
+    or `Parameter`, and any other reference shares the same (resolved) data.
+    """
+    def __init__(self, data: dict):
+        self.data = data
+        self.resolved = {}
+        self._resolving = []
+
+    def get_global(self, section: str, key: str) -> Describeable:
+        """
+        Get a global definition or parameter, loading it on first use.
+        """
+        return self.resolve_ref('#/%s/%s' % (section, escape(key)))
+
+    def resolve_ref(self, ref: str):
+        """
+        :param ref: A JSON pointer into the spec, like #/definitions/bad_request
+        :return: What the reference points to, with its own references resolved
+        :raises InvalidSpecError: If the reference is not local, does not exist or refers to itself
+        """
+        try:
+            return self.resolved[ref]
+        except KeyError:
+            pass
+        if ref in self._resolving:
+            cycle = self._resolving[self._resolving.index(ref):] + [ref]
+            raise InvalidSpecError("Cyclic reference: %s" % ' -> '.join(cycle))
+        if not ref.startswith('#/'):
+            raise InvalidSpecError("Only local references are supported, not %s" % ref)
+
+        self._resolving.append(ref)
+        try:
+            value = self.load(ref, [unescape(part) for part in ref[2:].split('/')])
+        finally:
+            self._resolving.pop()
+        self.resolved[ref] = value
+        return value
+
+    def load(self, ref, parts):
+        target = self.data
+        try:
+            for part in parts:
+                target = target[int(part) if isinstance(target, list) else part]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise InvalidSpecError("Unresolvable reference: %s" % ref)
+
+        value = self.resolve(target)
+        klass = GLOBAL_SECTIONS.get(parts[0]) if len(parts) == 2 else None
+        if klass is not None and not isinstance(value, Describeable):
+            value = self.data[parts[0]][parts[1]] = klass.from_json(value, is_global=True)
+        return value
+
+    def resolve(self, value):
+        """
+        Replace the references in a value, in place.
+
+        :return: The value, or what it points to if the value itself is a reference
+        """
+        if isinstance(value, dict):
+            ref = value.get('$ref')
+            if isinstance(ref, str):
+                return self.resolve_ref(ref)
+            for key, item in value.items():
+                if isinstance(item, (dict, list)):
+                    value[key] = self.resolve(item)
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                if isinstance(item, (dict, list)):
+                    value[index] = self.resolve(item)
+        return value
@@ -2,4 +2,4 @@ from esi.spec.describeable import Describeable
 
 
 class Schema(Describeable):
-    pass
+    __slots__ = ()
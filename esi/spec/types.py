@@ -1,13 +1,19 @@
 import base64
 import decimal
 from datetime import date, datetime
+from functools import partial
 from typing import Any, Dict, List, Tuple
 
-import iso8601
 import rfc3339
 from esi.exceptions import ValidationError
+from esi.spec.dates import parse_datetime, parse_epoch
 from esi.spec.describeable import Describeable, Property
 
+INTEGER_BOUNDARIES = {
+    "int32": 0x7FFFFFFF,
+    "int64": 0x7FFFFFFFFFFFFFFF,
+}
+
 
 class Type:
     python_type = None
@@ -40,6 +46,40 @@ class Type:
             value = self.python_type(value)
         return value
 
+    def _compile_cast(self):
+        python_type = self.python_type
+
+        def cast(value):
+            if not isinstance(value, python_type):
+                value = python_type(value)
+            return value
+        return cast
+
+    def compile_to_python(self, described: Describeable, epoch=False):
+        """
+        Compile the conversion of `to_python` for the described object into a single function, so the described object
+        does not have to be inspected again for every value.
+
+        :param described: The described object
+        :param epoch: True to convert dates and date-times to seconds since the epoch, rather than datetimes
+        :return: A function taking the value to convert
+        """
+        if type(self).to_python is not Type.to_python:
+            # A type only overriding `to_python` still converts through it
+            return partial(self.to_python, described)
+        return self._compile_cast()
+
+    def compile_from_python(self, described: Describeable):
+        """
+        Compile the conversion of `from_python` for the described object into a single function.
+
+        :param described: The described object
+        :return: A function taking the value to convert
+        """
+        if type(self).from_python is not Type.from_python:
+            return partial(self.from_python, described)
+        return self._compile_cast()
+
     def validate(self, described: Describeable, value):
         if not isinstance(value, self.get_valid_types(described)):
             _type = described._type
@@ -54,6 +94,36 @@ class Type:
                 }
             )
 
+    def _compile_type_check(self, described: Describeable):
+        valid_types = self.get_valid_types(described)
+        _type = described._type
+        if described.format:
+            _type = '%s.%s' % (_type, described.format)
+
+        def validate(value):
+            if not isinstance(value, valid_types):
+                raise ValidationError(
+                    "Invalid type: %(type)s",
+                    code='typeerror',
+                    params={
+                        'type': _type,
+                    }
+                )
+        return validate
+
+    def compile_validator(self, described: Describeable, shallow=False):
+        """
+        Compile `validate` for the described object into a single function.
+
+        :param described: The described object
+        :param shallow: True to only validate the value itself, skipping the items of arrays and properties of objects
+        :return: A function taking the value to validate, raising a `ValidationError` if it is invalid
+        """
+        if type(self).validate is not Type.validate:
+            # A type only overriding `validate` still validates through it
+            return partial(self.validate, described)
+        return self._compile_type_check(described)
+
     def get_typing_type(self, described: Describeable):
         return self.typing_type
 
@@ -74,7 +144,7 @@ class StringType(Type):
         """
         fmt = described.format
         if fmt in ("date", "date-time"):
-            value = iso8601.parse_date(value)
+            value = parse_datetime(value)
         elif fmt == "byte":
             if not isinstance(value, bytes):
                 value = value.encode()
@@ -121,6 +191,45 @@ class StringType(Type):
             value = super().to_python(described, value)
         return value
 
+    def compile_to_python(self, described: Describeable, epoch=False):
+        fmt = described.format
+        if fmt in ("date", "date-time"):
+            return parse_epoch if epoch else parse_datetime
+        elif fmt == "byte":
+            def to_python(value):
+                if not isinstance(value, bytes):
+                    value = value.encode()
+                return base64.b64decode(value)
+            return to_python
+        return self._compile_cast()
+
+    def compile_from_python(self, described: Describeable):
+        fmt = described.format
+        if fmt == "date":
+            def from_python(value):
+                if isinstance(value, datetime):
+                    value = value.date()
+                elif isinstance(value, int):
+                    value = datetime.fromtimestamp(value).date()
+                if isinstance(value, date):
+                    value = value.isoformat()
+                return value
+        elif fmt == "date-time":
+            def from_python(value):
+                if isinstance(value, datetime):
+                    value = rfc3339.rfc3339(value)
+                elif isinstance(value, int):
+                    value = rfc3339.rfc3339(datetime.fromtimestamp(value))
+                return value
+        elif fmt == "byte":
+            def from_python(value):
+                if not isinstance(value, bytes):
+                    value = value.encode()
+                return base64.b64encode(value).strip().decode()
+        else:
+            from_python = self._compile_cast()
+        return from_python
+
     def get_valid_types(self, described: Describeable) -> Tuple[type]:
         fmt = described.format
         types = (self.python_type,)
@@ -140,16 +249,7 @@ class IntegerType(Type):
     def validate(self, described: Describeable, value):
         super().validate(described, value)
 
-        _min = described.minimum
-        _max = described.maximum
-        fmt = described.format
-        boundary = {
-            "int32": 0x7FFFFFFF,
-            "int64": 0x7FFFFFFFFFFFFFFF,
-        }.get(fmt, None)
-        if boundary:
-            _max = min(_max or boundary, boundary)
-            _min = max(_min or -boundary, -boundary)
+        _min, _max = self.get_range(described)
         if any([
                 _min and value < _min,
                 _max and value > _max,
@@ -163,6 +263,32 @@ class IntegerType(Type):
                 }
             )
 
+    def get_range(self, described: Describeable):
+        _min = described.minimum
+        _max = described.maximum
+        boundary = INTEGER_BOUNDARIES.get(described.format)
+        if boundary:
+            _max = min(_max or boundary, boundary)
+            _min = max(_min or -boundary, -boundary)
+        return _min, _max
+
+    def compile_validator(self, described: Describeable, shallow=False):
+        check_type = self._compile_type_check(described)
+        _min, _max = self.get_range(described)
+
+        def validate(value):
+            check_type(value)
+            if (_min and value < _min) or (_max and value > _max):
+                raise ValidationError(
+                    "Value not within allowed range: %(min)s - %(max)s",
+                    code='value',
+                    params={
+                        'min': _min,
+                        'max': _max,
+                    }
+                )
+        return validate
+
 
 class NumberType(IntegerType):
     python_type = float
@@ -183,6 +309,15 @@ class BooleanType(Type):
                 code='value',
             )
 
+    def compile_validator(self, described: Describeable, shallow=False):
+        def validate(value):
+            if value not in (True, False):
+                raise ValidationError(
+                    "Value not within expected options",
+                    code='value',
+                )
+        return validate
+
 
 class ArrayType(Type):
     python_type = list
@@ -196,6 +331,14 @@ class ArrayType(Type):
         subitem = described.items
         return [subitem.from_python(x) for x in value]
 
+    def compile_to_python(self, described: Describeable, epoch=False):
+        convert = described.items.get_to_python(epoch)
+        return lambda value: [convert(x) for x in value]
+
+    def compile_from_python(self, described: Describeable):
+        convert = described.items.compiled_from_python
+        return lambda value: [convert(x) for x in value]
+
     def validate(self, described: Describeable, value):
         super().validate(described, value)
 
@@ -229,6 +372,42 @@ class ArrayType(Type):
         if suberrors:
             raise ValidationError({'[]': suberrors})
 
+    def compile_validator(self, described: Describeable, shallow=False):
+        check_type = self._compile_type_check(described)
+        _min = described.min_items or described.minimum
+        _max = described.max_items
+        unique = described.unique_items
+        check_item = None if shallow else described.items.compiled_validator
+
+        def validate(value):
+            check_type(value)
+            _len = len(value)
+            if (_min and _len < _min) or (_max and _len > _max):
+                raise ValidationError(
+                    "Value length not within allowed range: %(min)s - %(max)s",
+                    code='value',
+                    params={
+                        'min': _min,
+                        'max': _max,
+                    }
+                )
+            if unique and len(set(value)) != _len:
+                raise ValidationError(
+                    "Values are not unique",
+                    code='value',
+                )
+            if check_item is None:
+                return
+            suberrors = []
+            for item in value:
+                try:
+                    check_item(item)
+                except ValidationError as e:
+                    suberrors.append(e)
+            if suberrors:
+                raise ValidationError({'[]': suberrors})
+        return validate
+
     def get_typing_type(self, described: Describeable):
         return List[described.items.typing_type]
 
@@ -253,6 +432,40 @@ class ObjectType(Type):
             if name in value
         }
 
+    def compile_to_python(self, described: Describeable, epoch=False):
+        if described.properties is None:
+            return partial(self.to_python, described)
+        props = [
+            (name, prop.get_to_python(epoch), prop.default)
+            for name, prop in described.properties.items()
+        ]
+
+        def to_python(value):
+            result = {}
+            for name, convert, default in props:
+                if name in value:
+                    result[name] = convert(value[name])
+                elif default:
+                    result[name] = convert(default)
+            return result
+        return to_python
+
+    def compile_from_python(self, described: Describeable):
+        if described.properties is None:
+            return partial(self.from_python, described)
+        props = [
+            (name, prop.compiled_from_python)
+            for name, prop in described.properties.items()
+        ]
+
+        def from_python(value):
+            return {
+                name: convert(value[name])
+                for name, convert in props
+                if name in value
+            }
+        return from_python
+
     def validate(self, described: Describeable, value):
         props = described.properties  # type: Dict[str, Property]
         suberrors = {}
@@ -271,6 +484,33 @@ class ObjectType(Type):
         if suberrors:
             raise ValidationError(suberrors)
 
+    def compile_validator(self, described: Describeable, shallow=False):
+        if described.properties is None:
+            return partial(self.validate, described)
+        props = [
+            (name, None if shallow else prop.compiled_validator)
+            for name, prop in described.properties.items()
+        ]
+
+        def validate(value):
+            suberrors = {}
+            for name, check in props:
+                if name in value:
+                    if check is None:
+                        continue
+                    try:
+                        check(value[name])
+                    except ValidationError as e:
+                        e.update_error_dict(suberrors, name)
+                elif name in described.required:
+                    suberrors.setdefault(name, []).append(ValidationError(
+                        "Value is required",
+                        code='required',
+                    ))
+            if suberrors:
+                raise ValidationError(suberrors)
+        return validate
+
 
 class SchemaType(Type):
     python_type = object
@@ -284,10 +524,20 @@ class SchemaType(Type):
         schema = described.schema
         return schema.from_python(value)
 
+    def compile_to_python(self, described: Describeable, epoch=False):
+        return described.schema.get_to_python(epoch)
+
+    def compile_from_python(self, described: Describeable):
+        return described.schema.compiled_from_python
+
     def validate(self, described: Describeable, value):
         schema = described.schema
         return schema.validate(value)
 
+    def compile_validator(self, described: Describeable, shallow=False):
+        schema = described.schema
+        return schema.compiled_shallow_validator if shallow else schema.compiled_validator
+
     def get_typing_type(self, described: Describeable):
         return described.schema.typing_type
 
@@ -1,7 +1,7 @@
 import warnings
 from datetime import datetime
 from operator import itemgetter
-from os.path import isdir
+from os.path import isdir, join
 from typing import List, TextIO, Dict, Union
 
 from esi.exceptions import MissingPackageError, InvalidSpecError
@@ -163,6 +163,54 @@ class ESISpecWriter:
         else:
             return template.render(kwargs)
 
+    def get_tag_modules(self) -> Dict[str, dict]:
+        """
+        Group the paths by the module of their (first) tag, for the per-tag layout of `render_tags`.
+
+        :return: The paths per module name, by operation id
+        """
+        modules = {}
+        for name, path in self.spec.paths.items():
+            tag = path.tags[0] if path.tags else 'untagged'
+            modules.setdefault(to_camel_case(tag), {})[name] = path
+        return modules
+
+    def render_tags(self, directory: str, encoding=None, template_name='functions.py.jinja',
+                    package_template_name='functions_package.py.jinja', template_dirs: List[str]=None,
+                    package_names: List[str]=None, **render_kwargs):
+        """
+        Render the functions into a package with a module per tag, rather than into a single module. The `__init__`
+        of the package only imports a tag module when one of its functions is first used, so importing the package
+        does not build every function up front.
+
+        :param directory: The directory of the package to write the modules to.
+        :param encoding: The encoding to use when writing the modules.
+        :param template_name: The template to render each tag module with.
+        :param package_template_name: The template to render the `__init__` of the package with.
+        :param template_dirs: Extra template directories to look for templates in.
+        :param package_names: Extra package names to search in.
+        :return: The file names written, by module name
+        """
+        env = self.build_environment(template_dirs, package_names)
+        tag_modules = self.get_tag_modules()
+
+        kwargs = {
+            'spec': self.spec,
+            'now': datetime.utcnow(),
+            'tag_modules': tag_modules,
+        }
+        kwargs.update(render_kwargs)
+        outputs = [('__init__', package_template_name, {})]
+        outputs.extend((module, template_name, {'paths': paths}) for module, paths in sorted(tag_modules.items()))
+
+        ret = {}
+        for module, name, extra in outputs:
+            fname = join(directory, '%s.py' % module)
+            with open(fname, 'wb') as fh:
+                env.get_template(name).stream(dict(kwargs, **extra)).dump(fh, encoding=encoding or 'utf-8')
+            ret[module] = fname
+        return ret
+
     def eval(self, template_name='full.py.jinja', _globals=None, template_dirs: List[str]=None,
              package_names: List[str]=None, **render_kwargs):
         """
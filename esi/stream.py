@@ -0,0 +1,95 @@
+import codecs
+import json
+
+WHITESPACE = ' \t\n\r'
+
+
+class JSONArrayDecoder:
+    """
+    Incrementally decodes the elements of a top level JSON array, from the chunks of bytes it is received in.
+
+    Only the element currently being received is kept in memory, so large arrays can be processed element by element
+    without holding the raw payload (or the decoded array) in memory.
+    """
+    def __init__(self, encoding='utf-8'):
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder(encoding)()
+        self.buffer = ''
+        self.state = 'start'  # One of start, first, value, separator or done
+
+    def feed(self, chunk: bytes, final=False) -> list:
+        """
+        Add a chunk of the payload.
+
+        :param chunk: The next chunk of bytes
+        :param final: True if this is the last chunk
+        :return: The elements completed by this chunk
+        :raises ValueError: If the payload is not a valid JSON array
+        """
+        buf = self.buffer + self._text.decode(chunk, final=final)
+        pos = 0
+        items = []
+        while True:
+            while pos < len(buf) and buf[pos] in WHITESPACE:
+                pos += 1
+            if pos >= len(buf):
+                break
+            if self.state == 'start':
+                if buf[pos] != '[':
+                    raise ValueError("Expected a JSON array")
+                pos += 1
+                self.state = 'first'
+            elif self.state == 'separator' or (self.state == 'first' and buf[pos] == ']'):
+                if buf[pos] == ']':
+                    self.state = 'done'
+                elif buf[pos] == ',' and self.state == 'separator':
+                    self.state = 'value'
+                else:
+                    raise ValueError("Expected ',' or ']' at position %d" % pos)
+                pos += 1
+            elif self.state in ('first', 'value'):
+                try:
+                    item, end = self._decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    # The element is not complete yet
+                    break
+                after = end
+                while after < len(buf) and buf[after] in WHITESPACE:
+                    after += 1
+                if not final and (after == len(buf) or (buf[after] not in ',]' and isinstance(item, (int, float)))):
+                    # A number may continue in the next chunk (like 1. followed by 5), which only shows once the
+                    # separator after it is received
+                    break
+                items.append(item)
+                pos = end
+                self.state = 'separator'
+            else:
+                raise ValueError("Extra data after the JSON array")
+        self.buffer = buf[pos:]
+        if final and self.state != 'done':
+            raise ValueError("Unexpected end of the JSON array")
+        return items
+
+
+def iter_json_array(chunks, encoding='utf-8'):
+    """
+    Yield the elements of a JSON array as they are decoded from an iterable of byte chunks.
+    """
+    decoder = JSONArrayDecoder(encoding)
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.feed(b'', final=True)
+
+
+async def aiter_json_array(chunks, encoding='utf-8'):
+    """
+    Yield the elements of a JSON array as they are decoded from an async iterable of byte chunks.
+    """
+    decoder = JSONArrayDecoder(encoding)
+    async for chunk in chunks:
+        for item in decoder.feed(chunk):
+            yield item
+    for item in decoder.feed(b'', final=True):
+        yield item
@@ -0,0 +1,274 @@
+import asyncio
+import math
+import time
+from fnmatch import fnmatchcase
+from threading import Condition, Lock
+from typing import List, Tuple
+
+from esi.utils import PerLoop, try_int
+
+
+class ErrorLimitThrottle:
+    """
+    Tracks the error budget ESI reports through the `X-Esi-Error-Limit-Remain` and `X-Esi-Error-Limit-Reset` headers,
+    and slows down dispatching as the budget runs out.
+
+    While the remaining budget is above `slowdown_threshold` requests are not limited beyond `max_concurrency`. Below
+    it, both the number of requests in flight and the delay before each request scale with the remaining budget.
+    Once the budget drops to `pause_threshold`, dispatching is paused until the error window resets.
+
+    Use it as a (async) context manager around each request, and feed it the response headers through `update`.
+    """
+    def __init__(self, max_concurrency=None, slowdown_concurrency=20, slowdown_threshold=50, pause_threshold=5,
+                 max_delay=1.0):
+        """
+        :param max_concurrency: The maximum number of requests in flight while the budget is healthy (None for no
+                                limit)
+        :param slowdown_concurrency: The concurrency to scale down from once the budget drops below the threshold,
+                                     if `max_concurrency` is not set
+        :param slowdown_threshold: The remaining budget below which we start slowing down
+        :param pause_threshold: The remaining budget at (or below) which we pause until the window resets
+        :param max_delay: The delay (in seconds) before each request when the budget is nearly exhausted
+        """
+        self.max_concurrency = max_concurrency
+        self.slowdown_concurrency = slowdown_concurrency
+        self.slowdown_threshold = slowdown_threshold
+        self.pause_threshold = pause_threshold
+        self.max_delay = max_delay
+
+        self.remain = None  # type: int
+        self.reset_at = None  # type: float
+        self.in_flight = 0
+        self.delayed_count = 0
+        self._condition = Condition()
+        self._async_conditions = PerLoop(asyncio.Condition)
+
+    def update(self, headers, now=None):
+        """
+        Update the error budget from the response headers.
+        """
+        remain = try_int(headers.get('X-Esi-Error-Limit-Remain'))
+        reset = try_int(headers.get('X-Esi-Error-Limit-Reset'))
+        if remain is None:
+            return
+        now = time.time() if now is None else now
+        with self._condition:
+            self.remain = remain
+            self.reset_at = now + (reset or 0)
+            self._condition.notify_all()
+
+    def get_remain(self, now=None):
+        """
+        Get the remaining error budget, or None if it is unknown or the error window has reset since.
+        """
+        now = time.time() if now is None else now
+        if self.remain is None or self.reset_at is None or now >= self.reset_at:
+            return None
+        return self.remain
+
+    def is_paused(self, now=None):
+        remain = self.get_remain(now)
+        return remain is not None and remain <= self.pause_threshold
+
+    def get_concurrency_limit(self, now=None):
+        remain = self.get_remain(now)
+        if remain is None or remain >= self.slowdown_threshold:
+            return self.max_concurrency
+        if remain <= self.pause_threshold:
+            return 1
+        base = self.max_concurrency or self.slowdown_concurrency
+        return max(1, math.ceil(base * remain / self.slowdown_threshold))
+
+    def get_delay(self, now=None):
+        """
+        Get the amount of seconds to wait before dispatching the next request.
+        """
+        now = time.time() if now is None else now
+        remain = self.get_remain(now)
+        if remain is None or remain >= self.slowdown_threshold:
+            return 0
+        if remain <= self.pause_threshold:
+            return self.reset_at - now
+        return self.max_delay * (1 - remain / self.slowdown_threshold)
+
+    def _has_slot(self):
+        limit = self.get_concurrency_limit()
+        return limit is None or self.in_flight < limit
+
+    @property
+    def state(self):
+        """
+        The current state of the throttle, for metrics purposes.
+        """
+        now = time.time()
+        return {
+            'remain': self.get_remain(now),
+            'reset': max(self.reset_at - now, 0) if self.reset_at else None,
+            'in_flight': self.in_flight,
+            'concurrency_limit': self.get_concurrency_limit(now),
+            'delay': self.get_delay(now),
+            'paused': self.is_paused(now),
+            'delayed': self.delayed_count,
+        }
+
+    def acquire(self):
+        with self._condition:
+            self._condition.wait_for(self._has_slot)
+            self.in_flight += 1
+        delay = self.get_delay()
+        if delay > 0:
+            self.delayed_count += 1
+            time.sleep(delay)
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def acquire_async(self):
+        cond = self._async_conditions.get()
+        async with cond:
+            await cond.wait_for(self._has_slot)
+            self.in_flight += 1
+        delay = self.get_delay()
+        if delay > 0:
+            self.delayed_count += 1
+            await asyncio.sleep(delay)
+
+    async def release_async(self):
+        cond = self._async_conditions.get()
+        async with cond:
+            self.in_flight -= 1
+            cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    async def __aenter__(self):
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.release_async()
+
+
+class TokenBucket:
+    """
+    A token bucket, allowing `rate` requests per second on average with bursts of up to `burst` requests.
+
+    Tokens are reserved when acquired, even if the bucket is empty, so waiters are served in the order they arrived
+    rather than competing for each token as it becomes available.
+    """
+    def __init__(self, rate, burst=None):
+        """
+        :param rate: The amount of tokens added per second
+        :param burst: The maximum amount of tokens in the bucket, defaults to `rate` (and at least 1)
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, rate)
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self.delayed_count = 0
+        self._lock = Lock()
+
+    def reserve(self, now=None) -> float:
+        """
+        Take a token from the bucket.
+
+        :return: The amount of seconds to wait before the token may be used
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0
+            self.delayed_count += 1
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def __repr__(self):
+        return '<%s: %s/s, burst %s>' % (self.__class__.__name__, self.rate, self.burst)
+
+
+class RateLimiter:
+    """
+    Limits the rate of requests per route (group), using a token bucket for each rule.
+
+    A rule matches requests by the name of their function, one of its tags or a (glob) pattern of its path, like
+    `/markets/*`. A request waits for every bucket it matches, so a limit on a tag and a stricter one on a single route
+    can be combined. Requests that match no rule are not limited.
+
+    Waiting happens locally, before the request is sent, so bursts are smoothed out instead of being rejected by ESI.
+    """
+    def __init__(self):
+        self.rules = []  # type: List[Tuple[str, str, TokenBucket]]
+
+    def add(self, rate, burst=None, *, name=None, tag=None, path=None) -> TokenBucket:
+        """
+        Add a limit of `rate` requests per second, for the requests matching the specified name, tag or path pattern.
+
+        :param rate: The amount of requests allowed per second
+        :param burst: The amount of requests that can be made at once, defaults to `rate`
+        :param name: The name of the function (operation ID) to limit
+        :param tag: The tag of the functions to limit
+        :param path: A glob pattern matching the path of the functions to limit
+        :return: The bucket, which is shared by all matching requests
+        """
+        keys = [(kind, value) for kind, value in (('name', name), ('tag', tag), ('path', path)) if value is not None]
+        if len(keys) != 1:
+            raise ValueError("Exactly one of name, tag or path must be specified")
+        bucket = TokenBucket(rate, burst)
+        self.rules.append(keys[0] + (bucket,))
+        return bucket
+
+    def get_buckets(self, request):
+        """
+        Get the buckets that apply to the request.
+        """
+        from esi.spec import Function
+        if not isinstance(request, Function):
+            return []
+        buckets = []
+        for kind, value, bucket in self.rules:
+            if kind == 'name':
+                matches = request.name == value
+            elif kind == 'tag':
+                matches = value in (request.tags or [])
+            else:
+                matches = request.path is not None and fnmatchcase(request.path, value)
+            if matches:
+                buckets.append(bucket)
+        return buckets
+
+    def get_delay(self, request, now=None) -> float:
+        """
+        Reserve a token from every bucket that applies to the request.
+
+        :return: The amount of seconds to wait before the request may be sent
+        """
+        return max([bucket.reserve(now) for bucket in self.get_buckets(request)], default=0)
+
+    def acquire(self, request):
+        delay = self.get_delay(request)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, request):
+        delay = self.get_delay(request)
+        if delay > 0:
+            await asyncio.sleep(delay)
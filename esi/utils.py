@@ -1,7 +1,9 @@
+import asyncio
 import os
 import re
 import sys
 from argparse import ArgumentTypeError
+from weakref import WeakKeyDictionary
 
 from esi.version import __version__
 
@@ -25,7 +27,7 @@ def try_int(x, default=None):
     """
     try:
         return int(x)
-    except ValueError:
+    except (TypeError, ValueError):
         return default
 
 
@@ -80,6 +82,54 @@ class cached_property:
         return res
 
 
+class cached_slot_property:
+    """
+    Like `cached_property`, for classes using __slots__ rather than a __dict__.
+
+    The values are cached in a dict in the `_cache` slot of the instance, which the class has to declare and initialize
+    to None. That way, instances only pay for a cache once something is cached for them.
+    """
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = getattr(func, '__doc__')
+        self.name = func.__name__
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        cache = instance._cache
+        if cache is None:
+            cache = instance._cache = {}
+        try:
+            return cache[self.name]
+        except KeyError:
+            res = cache[self.name] = self.func(instance)
+            return res
+
+
+class PerLoop:
+    """
+    Keeps an asyncio primitive (like a `Lock` or `Condition`) per event loop, as they are bound to the loop they are
+    first used in.
+    """
+    def __init__(self, factory):
+        """
+        :param factory: The callable creating the primitive for a loop
+        """
+        self.factory = factory
+        self._instances = WeakKeyDictionary()
+
+    def get(self):
+        """
+        Get the primitive of the running loop, so only call this from a coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        instance = self._instances.get(loop)
+        if instance is None:
+            instance = self._instances[loop] = self.factory()
+        return instance
+
+
 class PathType(object):
     def __init__(self, exists=True, type='file', dash_ok=False):
         """
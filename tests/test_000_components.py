@@ -1,9 +1,14 @@
+import copy
+import pickle
 import unittest
 from operator import itemgetter
 
+from esi.exceptions import InvalidSpecError
 from esi.spec.describeable import Item, Property
+from esi.spec.loader import ESISpec
 from esi.spec.parameter import Parameter
 from esi.spec.schema import Schema
+from esi.spec.writer import ESISpecWriter
 
 SCHEMA_OUTPUT = """Schema(
     _items=Item(
@@ -39,6 +44,28 @@ CALL_SIGNATURES = [
     (Parameter(_type="integer", _name="_default", _default=1), "_default: int = 1"),
 ]
 
+REF_SPEC = {
+    'parameters': {
+        'page': {'name': 'page', 'in': 'query', 'type': 'integer'},
+    },
+    'definitions': {
+        'position': {'type': 'object', 'properties': {'x': {'type': 'number'}}},
+        'location': {'type': 'object', 'properties': {'position': {'$ref': '#/definitions/position'}}},
+    },
+    'paths': {
+        '/locations/': {
+            'get': {
+                'operationId': 'get_locations',
+                'parameters': [{'$ref': '#/parameters/page'}],
+                'responses': {
+                    '200': {'schema': {'type': 'array', 'items': {'$ref': '#/definitions/location'}}},
+                    '404': {'schema': {'$ref': '#/definitions/location'}},
+                },
+            },
+        },
+    },
+}
+
 
 class TestComponents(unittest.TestCase):
     def test_0001_repr(self):
@@ -61,3 +88,42 @@ class TestComponents(unittest.TestCase):
         for param, expected in CALL_SIGNATURES:
             with self.subTest(key=param.name):
                 self.assertEqual(param.call_signature, expected, "Could not create expected call signature")
+
+    def test_0005_slots(self):
+        for klass in (Parameter, Schema, Item, Property):
+            with self.subTest(klass=klass.__name__):
+                self.assertFalse(hasattr(klass(), '__dict__'), "Spec objects should not have a __dict__")
+        param = Parameter(_type="integer", _name="test", _minimum=1, _title="Test")
+        self.assertEqual((param._minimum, param._maximum, param._title), (1, None, "Test"))
+        # Fields left at their default share it, rather than being stored on the instance
+        self.assertIsNone(Parameter(_type="integer")._extra)
+        evaled = pickle.loads(pickle.dumps(param))
+        self.assertEqual(repr(evaled), repr(param), "Unpickled Parameter does not repr properly")
+
+    def test_0006_references(self):
+        spec = ESISpec(copy.deepcopy(REF_SPEC))
+        path = spec.paths['get_locations']
+        location = spec.global_definitions['location']
+        self.assertIs(path.parameters[0], spec.global_parameters['page'])
+        self.assertIs(path.responses[200].items, location, "References should share the global definition")
+        self.assertIs(path.responses[404], location)
+        self.assertIs(location.properties['position'], spec.global_definitions['position'])
+        self.assertEqual(path.responses[200].to_python([{'position': {'x': 1.5}}]), [{'position': {'x': 1.5}}])
+
+        cyclic = copy.deepcopy(REF_SPEC)
+        cyclic['definitions']['position']['properties']['location'] = {'$ref': '#/definitions/location'}
+        with self.assertRaisesRegex(InvalidSpecError, 'Cyclic reference'):
+            ESISpec(cyclic)
+
+        missing = copy.deepcopy(REF_SPEC)
+        missing['paths']['/locations/']['get']['parameters'].append({'$ref': '#/parameters/missing'})
+        with self.assertRaisesRegex(InvalidSpecError, 'Unresolvable reference'):
+            ESISpec(missing)
+
+    def test_0007_tag_modules(self):
+        data = copy.deepcopy(REF_SPEC)
+        data['paths']['/locations/']['get']['tags'] = ['Planetary Interaction', 'Location']
+        data['paths']['/status/'] = {'get': {'operationId': 'get_status', 'responses': {}}}
+        modules = ESISpecWriter(ESISpec(data)).get_tag_modules()
+        self.assertEqual({key: sorted(paths) for key, paths in modules.items()},
+                         {'planetary_interaction': ['get_locations'], 'untagged': ['get_status']})
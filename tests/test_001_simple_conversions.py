@@ -1,8 +1,17 @@
+import math
+import pickle
 import unittest
+from array import array
 from datetime import datetime, timezone
 from typing import List, Tuple, Any
 
-from esi.spec import Describeable, Item, Parameter, Schema
+import iso8601
+
+from esi.exceptions import MissingPackageError
+from esi.spec import Describeable, Item, Parameter, Property, Schema
+from esi.spec.columnar import Columns, get_flat_properties, numpy
+from esi.spec.dates import parse_datetime, parse_epoch
+from esi.spec.lazy import LazyObject, LazySequence, materialize
 
 CONVERSIONS = [
     (Describeable(_type="string"), "test", "test"),
@@ -37,3 +46,141 @@ class TestSimpleConversions(unittest.TestCase):
         for desc, _in, _out in CONVERSIONS:
             with self.subTest(_type=desc._type, _format=desc.format):
                 self.assertEqual(desc.from_python(_in), _out, "Could not properly convert from python to output")
+
+    def test_to_lazy(self):
+        for desc, _in, _out in CONVERSIONS:
+            with self.subTest(_type=desc._type, _format=desc.format):
+                value = desc.to_lazy(_out)
+                self.assertEqual(value, _in, "Could not properly convert input to a lazy view")
+                self.assertEqual(materialize(value), _in, "Could not properly materialize the lazy view")
+
+
+class CountingProperty(Property):
+    conversions = 0
+
+    def to_python(self, value):
+        CountingProperty.conversions += 1
+        return super().to_python(value)
+
+
+class TestLazyConversions(unittest.TestCase):
+    def setUp(self):
+        CountingProperty.conversions = 0
+        self.schema = Schema(_type="array", _items=Item(_type="object", _properties={
+            'issued': CountingProperty(_type="string", _format="date-time"),
+            'price': CountingProperty(_type="number"),
+            'range': CountingProperty(_type="string", _default="region"),
+        }))
+        self.raw = [{'issued': '2003-05-06T11:00:00Z', 'price': 1.5, 'unknown': 1} for _ in range(10)]
+
+    def test_on_access(self):
+        data = self.schema.to_lazy(self.raw)
+        self.assertIsInstance(data, LazySequence)
+        self.assertIsInstance(data[3], LazyObject)
+        self.assertEqual(CountingProperty.conversions, 0)
+        self.assertEqual(data[3]['price'], 1.5)
+        self.assertEqual(data[3]['price'], 1.5)
+        # Conversions are memoized
+        self.assertEqual(CountingProperty.conversions, 1)
+        self.assertEqual(sorted(data[3]), ['issued', 'price', 'range'])
+        self.assertEqual(data[3]['range'], 'region')
+        with self.assertRaises(KeyError):
+            data[3]['unknown']
+
+    def test_materialize(self):
+        data = self.schema.to_lazy(self.raw).materialize()
+        self.assertEqual(data, self.schema.to_python(self.raw))
+        self.assertIs(type(data), list)
+        self.assertIs(type(data[0]), dict)
+        self.assertEqual(data[0]['issued'], datetime(2003, 5, 6, 11, 0, 0, tzinfo=timezone.utc))
+
+
+class TestCompiledConversions(unittest.TestCase):
+    def test_matches_types(self):
+        for desc, _in, _out in CONVERSIONS:
+            with self.subTest(_type=desc._type, _format=desc.format):
+                self.assertEqual(desc.compiled_to_python(_out), desc.internal_type.to_python(desc, _out))
+                self.assertEqual(desc.compiled_from_python(_in), desc.internal_type.from_python(desc, _in))
+                # Compiled once, and reused afterwards
+                self.assertIs(desc.compiled_to_python, desc.compiled_to_python)
+
+    def test_pickle(self):
+        desc = Describeable(_type="object", _properties={'test': Parameter(_type="integer")})
+        desc.to_python({'test': 1})
+        self.assertEqual(pickle.loads(pickle.dumps(desc)).to_python({'test': 1}), {'test': 1})
+
+
+class TestColumnarConversions(unittest.TestCase):
+    def setUp(self):
+        self.schema = Schema(_type="array", _items=Item(_type="object", _properties={
+            'order_id': Property(_type="integer", _format="int64"),
+            'price': Property(_type="number", _format="double"),
+            'is_buy_order': Property(_type="boolean"),
+            'issued': Property(_type="string", _format="date-time"),
+            'range': Property(_type="string"),
+        }))
+        self.raw = [
+            {'order_id': 1, 'price': 1.5, 'is_buy_order': True, 'issued': '2003-05-06T11:00:00Z', 'range': 'region'},
+            {'order_id': 2, 'is_buy_order': False, 'issued': '2003-05-06T12:00:00+01:00', 'range': 'station'},
+        ]
+
+    def test_to_columns(self):
+        columns = self.schema.to_columns(self.raw, with_numpy=False)
+        self.assertIsInstance(columns, Columns)
+        self.assertEqual(columns.num_rows, 2)
+        self.assertEqual(columns['order_id'], array('q', [1, 2]))
+        self.assertEqual(columns['issued'], array('q', [1052218800] * 2))
+        self.assertEqual(columns['range'], ['region', 'station'])
+        # Missing numbers are stored as NaN
+        self.assertEqual(columns['price'][0], 1.5)
+        self.assertTrue(math.isnan(columns['price'][1]))
+        self.assertEqual(next(columns.rows())['is_buy_order'], True)
+
+    def test_extend(self):
+        columns = self.schema.to_columns(self.raw, with_numpy=False)
+        columns.extend(self.schema.to_columns(self.raw[:1], with_numpy=False))
+        self.assertEqual(columns.num_rows, 3)
+        self.assertEqual(columns['order_id'], array('q', [1, 2, 1]))
+
+    def test_not_flat(self):
+        schema = Schema(_type="array", _items=Item(_type="object", _properties={
+            'ids': Property(_type="array", _items=Item(_type="integer")),
+        }))
+        self.assertIsNone(get_flat_properties(schema))
+        with self.assertRaises(TypeError):
+            schema.to_columns([{'ids': [1]}])
+
+    @unittest.skipUnless(numpy, "NumPy is not installed")
+    def test_numpy(self):
+        columns = self.schema.to_columns(self.raw, with_numpy=True)
+        self.assertEqual(columns['order_id'].dtype, numpy.int64)
+        self.assertEqual(list(columns.to_records()['order_id']), [1, 2])
+
+    @unittest.skipIf(numpy, "NumPy is installed")
+    def test_numpy_missing(self):
+        with self.assertRaises(MissingPackageError):
+            self.schema.to_columns(self.raw, with_numpy=True)
+
+
+class TestDateParsing(unittest.TestCase):
+    def test_fast_path(self):
+        for value in ('2003-05-06T11:00:00Z', '2003-05-06T12:00:00+01:00', '2003-05-06T11:00:00.000Z'):
+            with self.subTest(value=value):
+                self.assertEqual(parse_datetime(value), iso8601.parse_date(value))
+                self.assertEqual(parse_epoch(value), 1052218800)
+        self.assertEqual(parse_datetime('2003-05-06'), datetime(2003, 5, 6, tzinfo=timezone.utc))
+
+    def test_invalid(self):
+        for value in ('2003-02-30T11:00:00Z', 'yesterday'):
+            with self.subTest(value=value):
+                with self.assertRaises(iso8601.ParseError):
+                    parse_datetime(value)
+
+    def test_epoch(self):
+        desc = Describeable(_type="array", _items=Item(_type="object", _properties={
+            'issued': Property(_type="string", _format="date-time"),
+        }))
+        value = [{'issued': '2003-05-06T11:00:00Z'}]
+        self.assertEqual(desc.to_python(value, epoch=True), [{'issued': 1052218800}])
+        self.assertEqual(desc.to_lazy(value, epoch=True)[0]['issued'], 1052218800)
+        self.assertEqual(desc.to_python(value), [{'issued': datetime(2003, 5, 6, 11, tzinfo=timezone.utc)}])
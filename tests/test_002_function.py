@@ -1,6 +1,8 @@
 import unittest
 
+from esi.exceptions import ValidationError
 from esi.spec import Describeable, Item, Parameter, Schema, Function
+from esi.spec.function import VALIDATION_OFF, VALIDATION_SHALLOW
 
 
 class SingleParam(Function):
@@ -59,3 +61,47 @@ class TestSimpleConversions(unittest.TestCase):
                 expected.update(data)
                 obj = klass(None, **kwargs)
                 self.assertEqual(obj.data, expected)
+
+
+class TestValidationLevels(unittest.TestCase):
+    def test_full(self):
+        with self.assertRaises(ValidationError):
+            SchemaArrayFunc(test=[1, 'a'])
+        with self.assertRaises(ValidationError):
+            SchemaArrayFunc(test=[1, 1])
+        with self.assertRaises(ValidationError):
+            SingleParam(test=0x80000000)
+
+    def test_shallow(self):
+        # The items are not validated, the array itself is
+        SchemaArrayFunc(test=[1, 'a'], esi_validation=VALIDATION_SHALLOW)
+        with self.assertRaises(ValidationError):
+            SchemaArrayFunc(test=[1, 1], esi_validation=VALIDATION_SHALLOW)
+        with self.assertRaises(ValidationError):
+            SingleParam(test='a', esi_validation=VALIDATION_SHALLOW)
+
+    def test_off(self):
+        obj = SingleParam(test='a', esi_validation=VALIDATION_OFF)
+        self.assertEqual(obj.arguments, {'test': 'a'})
+        with self.assertRaises(ValueError):
+            SingleParam(test=1, esi_validation='unknown')
+
+    def test_compiled_once(self):
+        params = SingleParam.get_compiled_params()
+        self.assertIs(SingleParam.get_compiled_params(), params)
+        self.assertEqual([x[:4] for x in params], [('test', 'test', 'query', None)])
+
+    def test_build(self):
+        obj = SingleParam.build(validation=VALIDATION_OFF, test='a')
+        self.assertIsInstance(obj, SingleParam)
+        self.assertEqual(obj.arguments, {'test': 'a'})
+        with self.assertRaises(ValidationError):
+            SingleParam.build(test='a')
+        with self.assertRaises(TypeError):
+            SingleParam.build(validation=VALIDATION_OFF, other=1)
+        with self.assertRaises(TypeError):
+            SingleParam.build(validation=VALIDATION_OFF)
+
+    def test_copy_with(self):
+        obj = SingleParam(test=1).copy_with(test='a', esi_validation=VALIDATION_OFF)
+        self.assertEqual(obj.arguments, {'test': 'a'})
@@ -0,0 +1,994 @@
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import typing
+import unittest
+from unittest import mock
+from email.utils import formatdate
+
+import httpx
+
+from esi.auth import TokenProvider
+from esi.cache import CacheEntry, FileSystemCache, MemoryCache, SQLiteCache, get_expiry
+from esi.core import ESIBase
+from esi.exceptions import ESIResponseError, ESIScopeRequired, MissingPackageError
+from esi.retry import RetryPolicy
+from esi.singleflight import SingleFlight
+from esi.stream import JSONArrayDecoder, iter_json_array
+from esi.throttle import ErrorLimitThrottle, RateLimiter, TokenBucket
+from esi.spec import ESISpec, Function, Item, Parameter, Property, Schema
+from esi.spec.columnar import Columns, numpy
+from esi.spec.lazy import LazySequence
+
+
+class TestESI(ESIBase):
+    version = '0.0.1'
+    host = 'esi.test'
+    base_path = '/latest'
+
+
+class Numbers(Function):
+    path = '/numbers/'
+    name = 'get_numbers'
+    method = 'get'
+    params = [
+        Parameter(
+            _format='int32',
+            _in='query',
+            _name='test',
+            _type='integer',
+            _required=True,
+        ),
+    ]
+    responses = {
+        200: Schema(_type='array', _items=Item(_type='integer')),
+    }
+
+    def __init__(self, test: int):
+        super().__init__(test=test)
+
+
+class ScopedNumbers(Numbers):
+    name = 'get_scoped_numbers'
+    scopes = ['esi-test.read_numbers.v1']
+
+
+class PagedNumbers(Function):
+    path = '/numbers/paged/'
+    name = 'get_numbers_paged'
+    method = 'get'
+    params = [
+        Parameter(
+            _default=1,
+            _format='int32',
+            _in='query',
+            _minimum=1,
+            _name='page',
+            _type='integer',
+        ),
+    ]
+    responses = {
+        200: Schema(_type='array', _items=Item(_type='integer')),
+    }
+
+    def __init__(self, page: int = 1):
+        super().__init__(page=page)
+
+
+class PostNames(Function):
+    path = '/names/'
+    name = 'post_names'
+    method = 'post'
+    params = [
+        Parameter(
+            _in='body',
+            _name='ids',
+            _required=True,
+            _schema=Schema(
+                _items=Item(_format='int32', _type='integer'),
+                _max_items=3,
+                _min_items=1,
+                _type='array',
+                _unique_items=True,
+            ),
+            _type='schema',
+        ),
+    ]
+    responses = {
+        200: Schema(_type='array', _items=Item(_type='integer')),
+    }
+
+    def __init__(self, ids: typing.List[int]):
+        super().__init__(ids=ids)
+
+
+class Orders(Function):
+    path = '/orders/'
+    name = 'get_orders'
+    method = 'get'
+    responses = {
+        200: Schema(_type='array', _items=Item(_type='object', _properties={
+            'order_id': Property(_type='integer', _format='int64'),
+            'price': Property(_type='number', _format='double'),
+        })),
+    }
+
+
+class FakeESI:
+    """
+    A tiny WSGI/ASGI stand-in for ESI, returning the configured responses and recording the requests made.
+    """
+    def __init__(self, body=None, headers=None, etag=None, pages=None):
+        self.body = body if body is not None else [1, 2, 3]
+        self.headers = headers or {}
+        self.etag = etag
+        self.pages = pages
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.delay = 0
+        self.lock = threading.Lock()
+        self.failures = []
+
+    def respond(self, path, query, headers, content=b''):
+        with self.lock:
+            self.requests.append((path, query, headers))
+        hdrs = dict(self.headers)
+        hdrs['content-type'] = 'application/json'
+        if self.failures:
+            # Fail with the configured status codes first
+            return self.failures.pop(0), hdrs, json.dumps({'error': 'failure'}).encode()
+        body = self.body
+        if self.pages:
+            # Every page contains two numbers, prefixed by the page number
+            page = int(dict(x.split('=') for x in query.split('&') if x).get('page', 1))
+            hdrs['x-pages'] = str(self.pages)
+            body = [page * 10, page * 10 + 1]
+        if content:
+            # Echo the posted values back
+            body = json.loads(content)
+        if self.etag:
+            hdrs['etag'] = self.etag
+            if headers.get('if-none-match') == self.etag:
+                return 304, hdrs, b''
+        return 200, hdrs, json.dumps(body).encode()
+
+    def __call__(self, environ, start_response):
+        headers = {
+            key[5:].replace('_', '-').lower(): value
+            for key, value in environ.items()
+            if key.startswith('HTTP_')
+        }
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        status, hdrs, body = self.respond(environ['PATH_INFO'], environ['QUERY_STRING'], headers,
+                                          environ['wsgi.input'].read(length) if length else b'')
+        start_response('%d %s' % (status, {200: 'OK', 304: 'Not Modified'}.get(status, 'Error')), list(hdrs.items()))
+        return [body]
+
+    async def asgi(self, scope, receive, send):
+        headers = {key.decode().lower(): value.decode() for key, value in scope['headers']}
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        message = await receive()
+        status, hdrs, body = self.respond(scope['path'], scope['query_string'].decode(), headers,
+                                          message.get('body', b''))
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(key.encode(), value.encode()) for key, value in hdrs.items()],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+class TestConditionalRequests(unittest.TestCase):
+    def test_etag_revalidation(self):
+        app = FakeESI(etag='"abc"')
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=app)
+        first, = client(Numbers(test=1))
+        second, = client(Numbers(test=1))
+        self.assertEqual(first[:2], (200, [1, 2, 3]))
+        self.assertEqual(second[:2], (200, [1, 2, 3]))
+        self.assertIs(first[1], second[1], "Revalidated payload was converted again")
+        self.assertIsNone(app.requests[0][2].get('if-none-match'))
+        self.assertEqual(app.requests[1][2].get('if-none-match'), '"abc"')
+
+    def test_etag_disabled(self):
+        app = FakeESI(etag='"abc"')
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=app, cache=None)
+        client(Numbers(test=1))
+        client(Numbers(test=1))
+        self.assertEqual([x[2].get('if-none-match') for x in app.requests], [None, None])
+
+    def test_default_cache_bounded(self):
+        now = time.time()
+        app = FakeESI(etag='"abc"', headers={'date': formatdate(now, usegmt=True),
+                                             'expires': formatdate(now + 300, usegmt=True)})
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=app)
+        client.cache.max_size = 2
+        for x in range(4):
+            client(Numbers(test=x))
+        client(Numbers(test=3))
+        self.assertEqual(len(client.cache), 2)
+        # Only used for revalidation, even though the response has not expired yet
+        self.assertEqual(len(app.requests), 5)
+        self.assertEqual(app.requests[-1][2].get('if-none-match'), '"abc"')
+
+    def test_async_etag_revalidation(self):
+        app = FakeESI(etag='"abc"')
+        esi = TestESI()
+
+        async def run():
+            client = esi.get_async_session_class()(esi=esi, app=app.asgi)
+            await client(Numbers(test=1))
+            return await client(Numbers(test=1))
+
+        status, data, headers = asyncio.run(run())
+        self.assertEqual((status, data), (200, [1, 2, 3]))
+        self.assertEqual(app.requests[1][2].get('if-none-match'), '"abc"')
+
+
+class TestMemoryCache(unittest.TestCase):
+    def test_serves_fresh_entries(self):
+        now = time.time()
+        app = FakeESI(headers={'date': formatdate(now, usegmt=True), 'expires': formatdate(now + 300, usegmt=True)})
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=app, cache=MemoryCache())
+        first, second = client(Numbers(test=1), Numbers(test=1))
+        self.assertEqual(len(app.requests), 1, "Fresh response was requested again")
+        self.assertIs(first[1], second[1])
+        client(Numbers(test=2))
+        self.assertEqual(len(app.requests), 2)
+
+    def test_expiry_clock_skew(self):
+        server_now = 1000000
+        headers = {
+            'Date': formatdate(server_now, usegmt=True),
+            'Expires': formatdate(server_now + 60, usegmt=True),
+        }
+        # Our clock being an hour ahead should not change the lifetime of the response
+        self.assertEqual(get_expiry(headers, now=server_now + 3600), server_now + 3660)
+        self.assertIsNone(get_expiry({}, now=server_now))
+
+    def test_lru_eviction(self):
+        cache = MemoryCache(max_size=2)
+        for key in 'ab':
+            cache.set(key, CacheEntry(None, 200, key, {}, expires=time.time() + 60))
+        cache.get('a')
+        cache.set('c', CacheEntry(None, 200, 'c', {}, expires=time.time() + 60))
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIsNotNone(cache.get_fresh('c'))
+        self.assertIsNone(cache.get_fresh('c', now=time.time() + 120))
+
+
+class TestPersistentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def get_caches(self, **kwargs):
+        return [
+            SQLiteCache(os.path.join(self.tmpdir.name, 'cache.sqlite'), **kwargs),
+            SQLiteCache(os.path.join(self.tmpdir.name, 'compressed.sqlite'), compress=True, **kwargs),
+            FileSystemCache(os.path.join(self.tmpdir.name, 'files'), **kwargs),
+            FileSystemCache(os.path.join(self.tmpdir.name, 'compressed'), compress=True, **kwargs),
+        ]
+
+    def test_roundtrip(self):
+        expires = time.time() + 60
+        for cache in self.get_caches():
+            with self.subTest(cache=cache.__class__.__name__, compress=cache.compress):
+                cache.set('key', CacheEntry('"abc"', 200, [1, 2, 3], {'ETag': '"abc"'}, expires=expires))
+                entry = cache.get('key')
+                self.assertEqual((entry.etag, entry.status_code, entry.data, entry.expires),
+                                 ('"abc"', 200, [1, 2, 3], expires))
+                self.assertEqual(entry.headers['etag'], '"abc"')
+                self.assertEqual(cache.get_validators('key'), ('"abc"', expires))
+                self.assertIsNotNone(cache.get_fresh('key'))
+                self.assertIsNone(cache.get('other'))
+                self.assertIsNone(cache.get_validators('other'))
+                self.assertEqual(len(cache), 1)
+                cache.delete('key')
+                self.assertNotIn('key', cache)
+
+    def test_max_size(self):
+        for cache in self.get_caches(max_size=2):
+            with self.subTest(cache=cache.__class__.__name__, compress=cache.compress):
+                cache.evict_interval = 1
+                for key in 'abc':
+                    cache.set(key, CacheEntry('"abc"', 200, key, {}, expires=time.time() + 60))
+                    # Make sure the entries are stored at distinct times
+                    time.sleep(0.01)
+                self.assertEqual(len(cache), 2)
+                self.assertNotIn('a', cache)
+                self.assertEqual(cache.get('c').data, 'c')
+
+    def test_purge_expired(self):
+        now = time.time()
+        for cache in self.get_caches(max_age=60):
+            with self.subTest(cache=cache.__class__.__name__, compress=cache.compress):
+                cache.set('fresh', CacheEntry(None, 200, [], {}, expires=now + 60))
+                cache.set('expired', CacheEntry(None, 200, [], {}, expires=now - 1))
+                cache.set('revalidatable', CacheEntry('"abc"', 200, [], {}, expires=now - 1))
+                cache.set('stale', CacheEntry('"abc"', 200, [], {}, expires=now - 120))
+                cache.purge_expired(now)
+                self.assertEqual(sorted(key for key in ('fresh', 'expired', 'revalidatable', 'stale') if key in cache),
+                                 ['fresh', 'revalidatable'])
+
+    def test_warm_start(self):
+        now = time.time()
+        app = FakeESI(headers={'date': formatdate(now, usegmt=True), 'expires': formatdate(now + 300, usegmt=True)})
+        esi = TestESI()
+        for first, second in zip(self.get_caches(), self.get_caches()):
+            with self.subTest(cache=first.__class__.__name__, compress=first.compress):
+                app.requests.clear()
+                esi.get_session_class()(esi=esi, app=app, cache=first)(Numbers(test=1))
+                # A new cache on the same storage, like a restarted process would create
+                status, data, headers = esi.get_session_class()(esi=esi, app=app, cache=second)(Numbers(test=1))[0]
+                self.assertEqual((status, data), (200, [1, 2, 3]))
+                self.assertEqual(len(app.requests), 1)
+
+    def test_lazy_warm_start(self):
+        now = time.time()
+        app = FakeESI(headers={'date': formatdate(now, usegmt=True), 'expires': formatdate(now + 300, usegmt=True)})
+        esi = TestESI()
+        for first, second in zip(self.get_caches(), self.get_caches()):
+            with self.subTest(cache=first.__class__.__name__, compress=first.compress):
+                app.requests.clear()
+                client = esi.get_session_class()(esi=esi, app=app, cache=first, lazy=True)
+                status, data, headers = client(Numbers(test=1))[0]
+                # Only convert some of the items before the response is stored
+                self.assertEqual(data[0], 1)
+                client = esi.get_session_class()(esi=esi, app=app, cache=second, lazy=True)
+                status, data, headers = client(Numbers(test=1))[0]
+                self.assertIsInstance(data, LazySequence)
+                self.assertEqual(list(data), [1, 2, 3])
+                self.assertEqual(len(app.requests), 1)
+
+    def test_revalidated_expiry(self):
+        esi = TestESI()
+        for cache in self.get_caches():
+            with self.subTest(cache=cache.__class__.__name__, compress=cache.compress):
+                now = time.time()
+                # Expired right away, so the next request revalidates it
+                app = FakeESI(etag='"abc"', headers={'date': formatdate(now, usegmt=True),
+                                                     'expires': formatdate(now, usegmt=True)})
+                client = esi.get_session_class()(esi=esi, app=app, cache=cache)
+                client(Numbers(test=1))
+                app.headers['expires'] = formatdate(now + 300, usegmt=True)
+                for _ in range(3):
+                    status, data, headers = client(Numbers(test=1))[0]
+                    self.assertEqual((status, data), (200, [1, 2, 3]))
+                # The 304 refreshed the expiry of the stored entry, so the last calls were served from the cache
+                self.assertEqual(len(app.requests), 2)
+
+    def test_single_load(self):
+        esi = TestESI()
+        app = FakeESI(etag='"abc"')
+        for cache in self.get_caches():
+            with self.subTest(cache=cache.__class__.__name__, compress=cache.compress):
+                client = esi.get_session_class()(esi=esi, app=app, cache=cache)
+                client(Numbers(test=1))
+                with mock.patch.object(CacheEntry, 'from_bytes', wraps=CacheEntry.from_bytes) as from_bytes:
+                    status, data, headers = client(Numbers(test=1))[0]
+                self.assertEqual((status, data, app.requests[-1][2].get('if-none-match')), (200, [1, 2, 3], '"abc"'))
+                self.assertEqual(from_bytes.call_count, 1, "A revalidated payload should only be loaded once")
+
+
+SPEC = {
+    'info': {'version': '1.2.3'},
+    'parameters': {'page': {'name': 'page', 'in': 'query', 'type': 'integer'}},
+    'paths': {
+        '/numbers/': {
+            'get': {
+                'operationId': 'get_numbers',
+                'parameters': [{'$ref': '#/parameters/page'}],
+                'responses': {'200': {'schema': {'type': 'array', 'items': {'type': 'integer'}}}},
+            },
+        },
+    },
+}
+
+
+class TestSpecCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def load(self, app, **kwargs):
+        cache = FileSystemCache(self.tmpdir.name, **kwargs)
+        return ESISpec.from_url('http://esi.test/latest/swagger.json', cache=cache, client=httpx.Client(app=app))
+
+    def test_revalidate(self):
+        app = FakeESI(body=SPEC, etag='"v1"')
+        first = self.load(app)
+        # A new cache on the same directory, like the next run of a job would create
+        second = self.load(app)
+        self.assertEqual([x[2].get('if-none-match') for x in app.requests], [None, '"v1"'])
+        self.assertIsNot(first, second)
+        self.assertEqual(str(second.version), '1.2.3')
+        path = second.paths['get_numbers']
+        self.assertIs(path.parameters[0], second.global_parameters['page'])
+        self.assertEqual(path.responses[200].to_python([1, 2]), [1, 2])
+
+        # A changed spec is downloaded and loaded again
+        app.etag = '"v2"'
+        app.body = dict(SPEC, info={'version': '1.2.4'})
+        self.assertEqual(str(self.load(app).version), '1.2.4')
+        self.assertEqual(str(self.load(app).version), '1.2.4')
+        self.assertEqual([x[2].get('if-none-match') for x in app.requests[2:]], ['"v1"', '"v2"'])
+
+    def test_fresh(self):
+        now = time.time()
+        app = FakeESI(body=SPEC, headers={'date': formatdate(now, usegmt=True),
+                                          'expires': formatdate(now + 300, usegmt=True)})
+        self.load(app)
+        self.assertIn('get_numbers', self.load(app).paths)
+        self.assertEqual(len(app.requests), 1, "A spec that has not expired should not be downloaded again")
+        self.load(app, honors_expires=False)
+        self.assertEqual(len(app.requests), 2)
+
+
+class TestErrorLimitThrottle(unittest.TestCase):
+    def test_scaling(self):
+        throttle = ErrorLimitThrottle(max_concurrency=40, slowdown_threshold=50, pause_threshold=5, max_delay=1.0)
+        now = 1000
+        self.assertEqual((throttle.get_concurrency_limit(now), throttle.get_delay(now)), (40, 0))
+        throttle.update({'X-Esi-Error-Limit-Remain': '100', 'X-Esi-Error-Limit-Reset': '30'}, now=now)
+        self.assertEqual((throttle.get_concurrency_limit(now), throttle.get_delay(now)), (40, 0))
+        throttle.update({'X-Esi-Error-Limit-Remain': '25', 'X-Esi-Error-Limit-Reset': '30'}, now=now)
+        self.assertEqual((throttle.get_concurrency_limit(now), throttle.get_delay(now)), (20, 0.5))
+        throttle.update({'X-Esi-Error-Limit-Remain': '2', 'X-Esi-Error-Limit-Reset': '30'}, now=now)
+        self.assertEqual((throttle.get_concurrency_limit(now), throttle.get_delay(now)), (1, 30))
+        self.assertTrue(throttle.is_paused(now))
+        # Once the error window resets, the budget is restored
+        self.assertEqual((throttle.get_concurrency_limit(now + 30), throttle.get_delay(now + 30)), (40, 0))
+
+    def test_client_tracks_budget(self):
+        app = FakeESI(headers={'X-Esi-Error-Limit-Remain': '80', 'X-Esi-Error-Limit-Reset': '30'})
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=app)
+        client(Numbers(test=1))
+        state = client.throttle.state
+        self.assertEqual(state['remain'], 80)
+        self.assertEqual(state['in_flight'], 0)
+        self.assertFalse(state['paused'])
+
+
+class TestPagination(unittest.TestCase):
+    def test_get_all_pages(self):
+        app = FakeESI(pages=4)
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=app)
+        status, data, headers = client.get_all_pages(PagedNumbers(), max_concurrency=2)
+        self.assertEqual(status, 200)
+        self.assertEqual(data, [10, 11, 20, 21, 30, 31, 40, 41])
+        self.assertEqual(len(app.requests), 4)
+
+    def test_no_page_param(self):
+        app = FakeESI(pages=4)
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=app)
+        # Without a page parameter, the other pages can not be requested
+        status, data, headers = client.get_all_pages(Numbers(test=1))
+        self.assertEqual((status, data), (200, [10, 11]))
+        self.assertEqual(len(app.requests), 1)
+
+    def test_async_get_all_pages(self):
+        app = FakeESI(pages=5)
+        esi = TestESI()
+
+        async def run():
+            client = esi.get_async_session_class()(esi=esi, app=app.asgi)
+            return await client.get_all_pages(PagedNumbers(), max_concurrency=2)
+
+        status, data, headers = asyncio.run(run())
+        self.assertEqual(data, [10, 11, 20, 21, 30, 31, 40, 41, 50, 51])
+
+    def test_iter_pages(self):
+        app = FakeESI(pages=5)
+        esi = TestESI()
+
+        async def run(**kwargs):
+            client = esi.get_async_session_class()(esi=esi, app=app.asgi)
+            return [x async for x in client.iter_pages(PagedNumbers(), max_concurrency=2, **kwargs)]
+
+        self.assertEqual(asyncio.run(run()), [10, 11, 20, 21, 30, 31, 40, 41, 50, 51])
+        self.assertEqual(asyncio.run(run(items=False)), [[10, 11], [20, 21], [30, 31], [40, 41], [50, 51]])
+        self.assertEqual(sorted(asyncio.run(run(ordered=False))), [10, 11, 20, 21, 30, 31, 40, 41, 50, 51])
+
+
+class TestBatch(unittest.TestCase):
+    def test_ordered_bounded_batch(self):
+        app = FakeESI()
+        esi = TestESI()
+
+        async def run():
+            client = esi.get_async_session_class()(esi=esi, app=app.asgi)
+            return await client.batch([Numbers(test=x) for x in range(1, 31)], max_concurrency=4)
+
+        results = asyncio.run(run())
+        self.assertEqual(len(results), 30)
+        self.assertEqual([x[0] for x in results], [200] * 30)
+        self.assertEqual(sorted(x[1] for x in app.requests), sorted('test=%d' % x for x in range(1, 31)))
+        self.assertLessEqual(app.max_in_flight, 4)
+
+    def test_return_exceptions(self):
+        app = FakeESI()
+        esi = TestESI()
+
+        async def run(**kwargs):
+            client = esi.get_async_session_class()(esi=esi, app=app.asgi)
+            return await client(Numbers(test=1), ScopedNumbers(test=2), Numbers(test=3), **kwargs)
+
+        first, second, third = asyncio.run(run(return_exceptions=True))
+        self.assertEqual(first[0], 200)
+        self.assertIsInstance(second, ESIScopeRequired)
+        self.assertEqual(third[0], 200)
+        with self.assertRaises(ESIScopeRequired):
+            asyncio.run(run())
+
+
+class TestCoalescing(unittest.TestCase):
+    def test_async_coalescing(self):
+        app = FakeESI()
+        esi = TestESI()
+
+        async def run():
+            client = esi.get_async_session_class()(esi=esi, app=app.asgi)
+            return await asyncio.gather(*[client.send_esi_request(Numbers(test=1)) for _ in range(5)],
+                                        client.send_esi_request(Numbers(test=2)))
+
+        results = asyncio.run(run())
+        self.assertEqual(len(app.requests), 2)
+        self.assertTrue(all(x[1] is results[0][1] for x in results[:5]))
+        self.assertIsNot(results[0][1], results[5][1])
+
+    def test_single_flight_threads(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return object()
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do('key', work)))
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=lambda: results.append(flight.do('key', work))) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        # Give the followers the chance to join the call in flight
+        time.sleep(0.05)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(x is results[0] for x in results))
+        self.assertEqual(len(flight), 0)
+
+
+class TestBulk(unittest.TestCase):
+    def test_bulk_requests(self):
+        requests = PostNames.bulk_requests([1, 2, 2, 3, 4, 5, 1, 6, 7])
+        self.assertEqual([x.arguments['ids'] for x in requests], [[1, 2, 3], [4, 5, 6], [7]])
+
+    def test_bulk(self):
+        app = FakeESI()
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=app)
+        status, data, headers = client.bulk(PostNames, range(10), max_concurrency=2)
+        self.assertEqual(data, list(range(10)))
+        self.assertEqual(len(app.requests), 4)
+
+    def test_async_bulk(self):
+        app = FakeESI()
+        esi = TestESI()
+
+        async def run():
+            client = esi.get_async_session_class()(esi=esi, app=app.asgi)
+            return await client.bulk(PostNames, [5, 4, 4, 3, 2, 1, 0], max_concurrency=2)
+
+        status, data, headers = asyncio.run(run())
+        self.assertEqual(data, [5, 4, 3, 2, 1, 0])
+
+
+class TestSyncBatch(unittest.TestCase):
+    def test_parallel_batch(self):
+        app = FakeESI()
+        app.delay = 0.01
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=app)
+        results = client(*[Numbers(test=x) for x in range(1, 21)], ScopedNumbers(test=21), max_concurrency=5,
+                         return_exceptions=True)
+        self.assertEqual([x[0] for x in results[:20]], [200] * 20)
+        self.assertIsInstance(results[20], ESIScopeRequired)
+        self.assertGreater(app.max_in_flight, 1)
+        self.assertLessEqual(app.max_in_flight, 5)
+        with self.assertRaises(ESIScopeRequired):
+            client(Numbers(test=1), ScopedNumbers(test=2))
+
+    def test_sequential_batch(self):
+        app = FakeESI()
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=app)
+        client.batch([Numbers(test=x) for x in range(1, 6)], max_concurrency=1)
+        self.assertEqual([x[1] for x in app.requests], ['test=%d' % x for x in range(1, 6)])
+
+
+class TestSharedConnections(unittest.TestCase):
+    def test_shared_client(self):
+        app = FakeESI()
+
+        class SharedESI(TestESI):
+            share_connections = True
+
+            def get_session_kwargs(self):
+                return {'app': app}
+
+        first = SharedESI(auth_token='first', enabled_scopes=ScopedNumbers.scopes, identity=1)
+        second = SharedESI(auth_token='second', enabled_scopes=ScopedNumbers.scopes, identity=2)
+        with first as first_client, second as second_client:
+            self.assertIs(first_client.client, second_client.client)
+            first_client(ScopedNumbers(test=1))
+            second_client(ScopedNumbers(test=1))
+            first_client(Numbers(test=1))
+        self.assertEqual([x[2].get('authorization') for x in app.requests],
+                         ['Bearer first', 'Bearer second', 'Bearer first'])
+        self.assertIsNot(SharedESI.shared_client, TestESI.shared_client)
+
+    def test_scoped_cache_keys(self):
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=FakeESI())
+        first = TestESI(auth_token='first', identity=1)
+        public, scoped = Numbers(test=1), ScopedNumbers(test=1)
+        client.prepare_esi_request(public, first)
+        client.prepare_esi_request(scoped, first)
+        self.assertEqual(client.get_cache_key(public), 'GET https://esi.test/latest/numbers/?test=1')
+        self.assertEqual(client.get_cache_key(scoped), 'GET https://esi.test/latest/numbers/?test=1 1')
+
+        # Without an identity, the access token is never part of the key
+        scoped = ScopedNumbers(test=1)
+        client.prepare_esi_request(scoped, TestESI(auth_token='SECRET'))
+        self.assertNotIn('SECRET', client.get_cache_key(scoped))
+        self.assertEqual(client.get_cache_key(scoped), client.get_cache_key(scoped))
+        # A callable token has no stable identity, so its scoped responses are not cached
+        scoped = ScopedNumbers(test=1)
+        client.prepare_esi_request(scoped, TestESI(auth_token=lambda: 'SECRET'))
+        self.assertIsNone(client.get_cache_key(scoped))
+
+    def test_conversion_cache_keys(self):
+        now = time.time()
+        app = FakeESI(headers={'date': formatdate(now, usegmt=True), 'expires': formatdate(now + 300, usegmt=True)})
+        esi, cache = TestESI(), MemoryCache()
+        lazy = esi.get_session_class()(esi=esi, app=app, cache=cache, lazy=True)
+        plain = esi.get_session_class()(esi=esi, app=app, cache=cache)
+        self.assertIsInstance(lazy(Numbers(test=1))[0][1], LazySequence)
+        # The converted data of one client is never served to a client converting it differently
+        self.assertNotIsInstance(plain(Numbers(test=1))[0][1], LazySequence)
+        self.assertIsInstance(lazy(Numbers(test=1))[0][1], LazySequence)
+        self.assertEqual(len(app.requests), 2)
+
+    def test_epoch_cache_keys(self):
+        esi = TestESI()
+        request = Numbers(test=1)
+        epoch = esi.get_session_class()(esi=esi, app=FakeESI(), epoch=True)
+        plain = esi.get_session_class()(esi=esi, app=FakeESI())
+        epoch.prepare_esi_request(request, esi)
+        self.assertEqual(epoch.get_cache_key(request), 'GET https://esi.test/latest/numbers/?test=1 (epoch)')
+        self.assertEqual(plain.get_cache_key(request), 'GET https://esi.test/latest/numbers/?test=1')
+
+
+class TestTokenProvider(unittest.TestCase):
+    def test_refresh_once(self):
+        tokens = iter(['first', 'second'])
+        provider = TokenProvider(lambda: (next(tokens), 1200), identity=1)
+        self.assertEqual([provider() for _ in range(3)], ['first'] * 3)
+        self.assertEqual(provider.refresh_count, 1)
+        provider.invalidate()
+        self.assertEqual(provider(), 'second')
+
+    def test_refresh_near_expiry(self):
+        provider = TokenProvider(lambda: ('new', 1200), margin=60, token='old', expires_at=time.time() + 30)
+        self.assertFalse(provider.is_valid())
+        self.assertEqual(provider(), 'new')
+
+    def test_async_stampede(self):
+        calls = []
+
+        async def refresh():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'token-%d' % len(calls), 1200
+
+        provider = TokenProvider(refresh_async=refresh, identity=1)
+        app = FakeESI()
+        esi = TestESI(auth_token=provider, enabled_scopes=ScopedNumbers.scopes)
+
+        async def run():
+            client = esi.get_async_session_class()(esi=esi, app=app.asgi)
+            return await client.batch([ScopedNumbers(test=x) for x in range(10)])
+
+        asyncio.run(run())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({x[2].get('authorization') for x in app.requests}, {'Bearer token-1'})
+        self.assertEqual(esi.get_identity(), 1)
+
+    def test_sync_and_async_refresh_once(self):
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'token-%d' % len(calls), 1200
+
+        provider = TokenProvider(refresh, identity=1)
+        barrier = threading.Barrier(3)
+        tokens = []
+
+        def get_sync():
+            barrier.wait()
+            tokens.append(provider.get_token())
+
+        def get_async():
+            async def run():
+                barrier.wait()
+                tokens.extend(await asyncio.gather(*[provider.get_token_async() for _ in range(3)]))
+            asyncio.run(run())
+
+        # A sync client and two event loops needing the token at the same time
+        threads = [threading.Thread(target=x) for x in (get_sync, get_async, get_async)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(tokens, ['token-1'] * 7)
+
+
+class TestRetry(unittest.TestCase):
+    def get_client(self, app, **kwargs):
+        esi = TestESI()
+        return esi.get_session_class()(esi=esi, app=app, retry=RetryPolicy(backoff_factor=0, **kwargs))
+
+    def test_retries_server_errors(self):
+        app = FakeESI()
+        app.failures = [502, 503]
+        status, data, headers = self.get_client(app).send_esi_request(Numbers(test=1))
+        self.assertEqual((status, data), (200, [1, 2, 3]))
+        self.assertEqual(len(app.requests), 3)
+
+    def test_gives_up(self):
+        app = FakeESI()
+        app.failures = [504, 504, 504]
+        status, data, headers = self.get_client(app, max_retries=2).send_esi_request(Numbers(test=1))
+        self.assertEqual(status, 504)
+        self.assertEqual(len(app.requests), 3)
+
+    def test_non_idempotent(self):
+        app = FakeESI()
+        app.failures = [503]
+        status, data, headers = self.get_client(app).send_esi_request(PostNames(ids=[1]))
+        self.assertEqual(status, 503)
+        self.assertEqual(len(app.requests), 1)
+
+    def test_batch_budget(self):
+        app = FakeESI()
+        app.failures = [503] * 10
+        client = self.get_client(app, min_budget=2, budget_ratio=0)
+        results = client.batch([Numbers(test=x) for x in range(1, 4)], max_concurrency=1)
+        # Two retries are allowed for the whole batch, after that the failures are returned
+        self.assertEqual(len(app.requests), 5)
+        self.assertEqual([x[0] for x in results], [503, 503, 503])
+
+    def test_async_retry(self):
+        app = FakeESI()
+        app.failures = [420]
+        esi = TestESI()
+
+        async def run():
+            client = esi.get_async_session_class()(esi=esi, app=app.asgi, retry=RetryPolicy(jitter=False))
+            return await client(Numbers(test=1))
+
+        app.headers = {'X-Esi-Error-Limit-Reset': '0'}
+        status, data, headers = asyncio.run(run())
+        self.assertEqual(status, 200)
+        self.assertEqual(len(app.requests), 2)
+
+    def test_server_delay(self):
+        policy = RetryPolicy(jitter=False)
+
+        class Response:
+            def __init__(self, status_code, headers):
+                self.status_code = status_code
+                self.headers = headers
+
+        self.assertEqual(policy.get_delay(0, Response(503, {'Retry-After': '7'})), 7)
+        self.assertEqual(policy.get_delay(0, Response(503, {'Retry-After': formatdate(1010, usegmt=True)}),
+                                          now=1000), 10)
+        self.assertEqual(policy.get_delay(0, Response(420, {'X-Esi-Error-Limit-Reset': '12'})), 12)
+        self.assertEqual(policy.get_delay(2, Response(503, {})), 2)
+
+
+class TestHTTP2(unittest.TestCase):
+    def test_http2_session_class(self):
+        from esi.client import HTTP2AsyncClient
+
+        class HTTP2ESI(TestESI):
+            http2 = True
+
+        self.assertIs(HTTP2ESI().get_async_session_class(), HTTP2AsyncClient)
+        self.assertIsNot(TestESI().get_async_session_class(), HTTP2AsyncClient)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        now = bucket.updated_at
+        self.assertEqual([bucket.reserve(now), bucket.reserve(now)], [0, 0])
+        # Once the burst is used up, waiters queue up behind each other
+        self.assertAlmostEqual(bucket.reserve(now), 0.1)
+        self.assertAlmostEqual(bucket.reserve(now), 0.2)
+        self.assertAlmostEqual(bucket.reserve(now + 1), 0)
+
+    def test_matching(self):
+        limiter = RateLimiter()
+        by_name = limiter.add(1, name='get_numbers')
+        by_tag = limiter.add(1, tag='Paged')
+        by_path = limiter.add(1, path='/numbers/*/')
+
+        class TaggedNumbers(PagedNumbers):
+            tags = ['Paged']
+
+        self.assertEqual(limiter.get_buckets(Numbers(test=1)), [by_name])
+        self.assertEqual(limiter.get_buckets(TaggedNumbers()), [by_tag, by_path])
+        self.assertEqual(limiter.get_buckets(PostNames(ids=[1])), [])
+        with self.assertRaises(ValueError):
+            limiter.add(1, name='get_numbers', tag='Paged')
+
+    def test_client_waits(self):
+        app = FakeESI()
+        esi = TestESI()
+        limiter = RateLimiter()
+        limiter.add(20, burst=1, name='get_numbers')
+        client = esi.get_session_class()(esi=esi, app=app, rate_limiter=limiter)
+        start = time.monotonic()
+        results = client.batch([Numbers(test=x) for x in range(1, 5)])
+        self.assertEqual([x[0] for x in results], [200] * 4)
+        # The first request uses the burst, the others wait for their token
+        self.assertGreaterEqual(time.monotonic() - start, 0.14)
+
+    def test_async_client_waits(self):
+        app = FakeESI()
+        esi = TestESI()
+        limiter = RateLimiter()
+        bucket = limiter.add(20, burst=2, path='/numbers/')
+
+        async def run():
+            client = esi.get_async_session_class()(esi=esi, app=app.asgi, rate_limiter=limiter)
+            return await client(*[Numbers(test=x) for x in range(1, 5)])
+
+        start = time.monotonic()
+        results = asyncio.run(run())
+        self.assertEqual([x[0] for x in results], [200] * 4)
+        self.assertEqual(bucket.delayed_count, 2)
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+class TestStreaming(unittest.TestCase):
+    def test_decoder(self):
+        payload = b' [1, {"a": [2, "x]"]}, "\xc3\xa9", 345 , null]\n'
+        for size in (1, 3, len(payload)):
+            with self.subTest(chunk_size=size):
+                chunks = [payload[x:x + size] for x in range(0, len(payload), size)]
+                self.assertEqual(list(iter_json_array(chunks)), [1, {'a': [2, 'x]']}, '\xe9', 345, None])
+        self.assertEqual(list(iter_json_array([b'[', b' ]'])), [])
+
+    def test_decoder_chunk_boundaries(self):
+        payload = json.dumps([1.5, -2.25e3, 1E-2, 0, -7, 12345678901, 'a,]"\u00e9', True, None, {'x': [1.0, {}]}, []],
+                             ensure_ascii=False).encode()
+        expected = json.loads(payload)
+        # Every split into two and three chunks
+        for x in range(len(payload) + 1):
+            for y in range(x, len(payload) + 1):
+                chunks = [payload[:x], payload[x:y], payload[y:]]
+                self.assertEqual(list(iter_json_array(chunks)), expected, chunks)
+        rnd = random.Random(1)
+        for _ in range(200):
+            cuts = sorted(rnd.sample(range(1, len(payload)), rnd.randint(1, 20)))
+            chunks = [payload[a:b] for a, b in zip([0] + cuts, cuts + [len(payload)])]
+            self.assertEqual(list(iter_json_array(chunks)), expected, chunks)
+
+    def test_decoder_incremental(self):
+        decoder = JSONArrayDecoder()
+        self.assertEqual(decoder.feed(b'[{"a": 1}, {"b"'), [{'a': 1}])
+        # Only the element being received is buffered
+        self.assertEqual(decoder.buffer, '{"b"')
+        self.assertEqual(decoder.feed(b': 2}]', final=True), [{'b': 2}])
+
+    def test_decoder_invalid(self):
+        for payload in (b'{"a": 1}', b'[1, 2', b'[1 2]', b'[1] 2'):
+            with self.subTest(payload=payload):
+                with self.assertRaises(ValueError):
+                    list(iter_json_array([payload]))
+
+    def test_stream(self):
+        app = FakeESI(body=[1, 2, 3, 4])
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=app)
+        self.assertEqual(list(client.stream_esi_request(Numbers(test=1))), [1, 2, 3, 4])
+        app.failures = [404]
+        with self.assertRaises(ESIResponseError):
+            list(client.stream_esi_request(Numbers(test=1)))
+
+    def test_lazy_stream(self):
+        app = FakeESI(body=[1, 2])
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=app, lazy=True)
+        status, data, headers = client.send_esi_request(Numbers(test=1))
+        self.assertIsInstance(data, LazySequence)
+        self.assertEqual(data, [1, 2])
+
+    def test_async_stream(self):
+        app = FakeESI(body=[1, 2, 3, 4])
+        esi = TestESI()
+
+        async def run():
+            client = esi.get_async_session_class()(esi=esi, app=app.asgi)
+            return [x async for x in client.stream_esi_request(Numbers(test=1))]
+
+        self.assertEqual(asyncio.run(run()), [1, 2, 3, 4])
+
+
+class TestColumnar(unittest.TestCase):
+    def test_columnar_pages(self):
+        app = FakeESI(body=[{'order_id': 1, 'price': 1.5}, {'order_id': 2, 'price': 2.5}])
+        esi = TestESI()
+        client = esi.get_session_class()(esi=esi, app=app, columnar=True)
+        first = client.send_esi_request(Orders())
+        self.assertEqual(first[1].num_rows, 2)
+        status, data, headers = client.merge_results([first, client.send_esi_request(Orders())])
+        self.assertEqual(list(data['order_id']), [1, 2, 1, 2])
+        # The data of the first page is left alone
+        self.assertEqual(first[1].num_rows, 2)
+        # Other responses are converted as usual
+        app.body = [1, 2]
+        self.assertEqual(client.send_esi_request(Numbers(test=1))[1], [1, 2])
+
+    def test_columnar_cache_keys(self):
+        now = time.time()
+        app = FakeESI(body=[{'order_id': 1, 'price': 1.5}],
+                      headers={'date': formatdate(now, usegmt=True), 'expires': formatdate(now + 300, usegmt=True)})
+        esi, cache = TestESI(), MemoryCache()
+        columnar = esi.get_session_class()(esi=esi, app=app, cache=cache, columnar=True)
+        plain = esi.get_session_class()(esi=esi, app=app, cache=cache)
+        self.assertIsInstance(columnar(Orders())[0][1], Columns)
+        self.assertEqual(plain(Orders())[0][1], [{'order_id': 1, 'price': 1.5}])
+        self.assertEqual(len(app.requests), 2)
+
+    @unittest.skipIf(numpy, "NumPy is installed")
+    def test_numpy_missing(self):
+        esi = TestESI()
+        with self.assertRaises(MissingPackageError):
+            esi.get_session_class()(esi=esi, app=FakeESI(), columnar='numpy')